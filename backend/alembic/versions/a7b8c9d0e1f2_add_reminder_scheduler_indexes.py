@@ -0,0 +1,34 @@
+"""add reminder scheduler indexes
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a7b8c9d0e1f2"
+down_revision = "f6a7b8c9d0e1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_reminder_due",
+        "reminders",
+        ["remind_at"],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index(
+        "ix_reminder_user_status",
+        "reminders",
+        ["user_id", "status"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reminder_user_status", table_name="reminders")
+    op.drop_index("ix_reminder_due", table_name="reminders")
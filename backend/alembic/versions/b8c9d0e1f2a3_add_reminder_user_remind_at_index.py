@@ -0,0 +1,26 @@
+"""add reminder user/remind_at index
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b8c9d0e1f2a3"
+down_revision = "a7b8c9d0e1f2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_reminder_user_remindat",
+        "reminders",
+        ["user_id", "remind_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reminder_user_remindat", table_name="reminders")
@@ -0,0 +1,29 @@
+"""add unique index on system agents
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "c9d0e1f2a3b4"
+down_revision = "b8c9d0e1f2a3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ux_agents_name_type_system",
+        "agents",
+        ["name", "agent_type"],
+        unique=True,
+        postgresql_where=sa.text("is_system"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ux_agents_name_type_system", table_name="agents")
@@ -0,0 +1,40 @@
+"""add notification email_failed and re-key the dispatch index
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d0e1f2a3b4c5"
+down_revision = "c9d0e1f2a3b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "notifications",
+        sa.Column("email_failed", sa.Boolean(), nullable=False, server_default=sa.text("false")),
+    )
+    op.drop_index("ix_notif_pending_dispatch", table_name="notifications")
+    op.create_index(
+        "ix_notif_pending_dispatch",
+        "notifications",
+        ["created_at"],
+        postgresql_where=sa.text("email_sent = false AND email_failed = false AND is_read = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notif_pending_dispatch", table_name="notifications")
+    op.create_index(
+        "ix_notif_pending_dispatch",
+        "notifications",
+        ["email_sent", "is_read"],
+        postgresql_where=sa.text("email_sent = false AND is_read = false"),
+    )
+    op.drop_column("notifications", "email_failed")
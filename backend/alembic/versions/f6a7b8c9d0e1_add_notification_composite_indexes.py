@@ -0,0 +1,34 @@
+"""add notification composite indexes
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "f6a7b8c9d0e1"
+down_revision = "e5f6a7b8c9d0"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_notif_user_unread_created",
+        "notifications",
+        ["user_id", "is_read", sa.text("created_at DESC")],
+    )
+    op.create_index(
+        "ix_notif_pending_dispatch",
+        "notifications",
+        ["email_sent", "is_read"],
+        postgresql_where=sa.text("email_sent = false AND is_read = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notif_pending_dispatch", table_name="notifications")
+    op.drop_index("ix_notif_user_unread_created", table_name="notifications")
@@ -739,11 +739,17 @@ def override_result(
     assessed = compliant + non_compliant
     score = round((compliant / assessed) * 100) if assessed > 0 else 0
 
+    # Re-assign top-level keys with new objects — the MutableDict column only
+    # tracks top-level changes, not edits nested inside results/summary
+    analysis["results"] = list(analysis["results"])
     if "summary" in analysis:
-        analysis["summary"]["compliant"] = compliant
-        analysis["summary"]["non_compliant"] = non_compliant
-        analysis["summary"]["not_applicable"] = na
-        analysis["summary"]["compliance_score"] = score
+        analysis["summary"] = {
+            **analysis["summary"],
+            "compliant": compliant,
+            "non_compliant": non_compliant,
+            "not_applicable": na,
+            "compliance_score": score,
+        }
 
     ComplianceSessionService.update_session(
         db, session_id, {
@@ -2,7 +2,6 @@
 Document API Endpoints - Full CRUD with file upload, search, filtering, and download
 """
 from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
-from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
 from typing import Optional
@@ -129,14 +128,10 @@ async def download_document(
     current_user: User = Depends(get_current_active_user),
 ):
     """Download the document file."""
-    import os
     doc = DocumentService.get_document(UUID(document_id), db)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    if not doc.storage_path or not os.path.exists(doc.storage_path):
+    response = DocumentService.stream_document(doc)
+    if response is None:
         raise HTTPException(status_code=404, detail="File not found on disk")
-    return FileResponse(
-        path=doc.storage_path,
-        filename=doc.original_filename,
-        media_type=doc.content_type or "application/octet-stream",
-    )
\ No newline at end of file
+    return response
\ No newline at end of file
@@ -58,17 +58,19 @@ def create_workflow(
 @router.get("")
 def get_workflows(
     status: Optional[str] = Query(None, description="Filter by status"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Omit to return all"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
 ):
     """List all workflow templates."""
-    workflows = WorkflowService.list_workflows(db=db, status=status)
+    workflows = WorkflowService.list_workflows(db=db, status=status, skip=skip, limit=limit)
     return [
         {
             "id": str(w.id),
             "name": w.name,
             "description": w.description,
-            "status": w.status.value if hasattr(w.status, "value") else str(w.status),
+            "status": w.status.value,
             "organization_id": str(w.organization_id),
             "created_by": str(w.created_by),
             "created_at": w.created_at,
@@ -167,11 +169,13 @@ def create_stage(
 @router.get("/{workflow_id}/stages")
 def get_stages(
     workflow_id: UUID,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Omit to return all"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
 ):
     """List stages for a workflow."""
-    stages = WorkflowService.list_stages(workflow_id, db)
+    stages = WorkflowService.list_stages(workflow_id, db, skip=skip, limit=limit)
     return [
         {
             "id": str(s.id),
@@ -272,11 +276,13 @@ def create_step(
 @router.get("/stages/{stage_id}/steps")
 def get_steps(
     stage_id: UUID,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Omit to return all"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
 ):
     """List steps for a stage."""
-    steps = WorkflowService.list_steps(stage_id, db)
+    steps = WorkflowService.list_steps(stage_id, db, skip=skip, limit=limit)
     return [
         {
             "id": str(s.id),
@@ -363,11 +369,13 @@ def create_task(
 @router.get("/steps/{step_id}/tasks")
 def get_tasks(
     step_id: UUID,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Omit to return all"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.MANAGER)),
 ):
     """List tasks for a step."""
-    tasks = WorkflowService.list_tasks(step_id, db)
+    tasks = WorkflowService.list_tasks(step_id, db, skip=skip, limit=limit)
     return [
         {
             "id": str(t.id),
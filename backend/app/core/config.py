@@ -14,6 +14,10 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_ECHO_POOL: bool = False  # log pool checkouts/checkins (debugging)
 
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = []
@@ -3,8 +3,16 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from app.core.config import settings
 
-# Create engine
-engine = create_engine(settings.DATABASE_URL)
+# Create engine with an explicitly sized pool; pre-ping drops connections
+# that went stale (e.g. after a DB restart) before they reach a request
+engine = create_engine(
+    settings.DATABASE_URL,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    echo_pool="debug" if settings.DB_ECHO_POOL else False,
+)
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -19,3 +27,18 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+def commit_returning(db: Session, stmt):
+    """Execute an ORM INSERT/UPDATE ... RETURNING <Model>, commit, and return the row.
+
+    The row is detached before the commit so the values that came back with
+    RETURNING are not expired and re-SELECTed on first access.
+    Returns None when no row matched.
+    """
+    row = db.execute(stmt).scalar_one_or_none()
+    if row is None:
+        return None
+    db.expunge(row)
+    db.commit()
+    return row
@@ -2,47 +2,150 @@ import asyncio
 import logging
 from contextlib import asynccontextmanager
 
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.db.session import engine, Base, SessionLocal
-from app.services.reminder_service import ReminderService
+from app.services.reminder_service import (
+    REMINDER_BATCH_SIZE,
+    REMINDER_NOTIFY_CHANNEL,
+    ReminderService,
+)
+from app.services.notification_service import NotificationService, close_http_client
 
 logger = logging.getLogger(__name__)
 
 REMINDER_CHECK_INTERVAL_SECONDS = 60
+REMINDER_FALLBACK_POLL_SECONDS = 300
+REMINDER_MIN_SLEEP_SECONDS = 1
+EMAIL_DISPATCH_INTERVAL_SECONDS = 30
+
+
+def _start_reminder_listener(wakeup: asyncio.Event):
+    """LISTEN for reminder NOTIFYs on a dedicated connection and set wakeup on each.
+
+    Returns the psycopg2 connection, or None if it could not be opened
+    (the scheduler then relies on its timed polls alone).
+    """
+    try:
+        conn = psycopg2.connect(
+            engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        )
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {REMINDER_NOTIFY_CHANNEL}")
+    except psycopg2.Error:
+        logger.exception("Reminder listener unavailable; falling back to polling")
+        return None
+
+    loop = asyncio.get_running_loop()
+
+    def _on_notify():
+        try:
+            conn.poll()
+        except psycopg2.Error:
+            logger.exception("Reminder listener connection lost")
+            loop.remove_reader(conn.fileno())
+            conn.close()
+            wakeup.set()
+            return
+        if conn.notifies:
+            conn.notifies.clear()
+            wakeup.set()
+
+    loop.add_reader(conn.fileno(), _on_notify)
+    return conn
+
+
+def _stop_reminder_listener(conn) -> None:
+    if conn is None or conn.closed:
+        return
+    asyncio.get_running_loop().remove_reader(conn.fileno())
+    conn.close()
 
 
 async def _reminder_loop():
-    """Periodically process pending reminders.
+    """Process pending reminders whenever one falls due.
+    Sleeps until the earliest pending remind_at, or until a reminder is
+    created/rescheduled (Postgres NOTIFY), with a long fallback poll.
     All state lives in the DB — safe across restarts."""
+    wakeup = asyncio.Event()
+    listener = None
+    try:
+        while True:
+            if listener is None or listener.closed:
+                listener = _start_reminder_listener(wakeup)
+            wakeup.clear()
+
+            sent = 0
+            # Without a listener, new reminders are only noticed by polling
+            delay = REMINDER_FALLBACK_POLL_SECONDS if listener else REMINDER_CHECK_INTERVAL_SECONDS
+            try:
+                db = SessionLocal()
+                try:
+                    sent = ReminderService.process_pending_reminders(db)
+                    if sent:
+                        logger.info("Reminder scheduler: sent %d reminder(s)", sent)
+                    next_due = ReminderService.seconds_until_next_due(db)
+                    if next_due is not None:
+                        # Floor: rows still due here may be locked by another worker
+                        delay = min(delay, max(next_due, REMINDER_MIN_SLEEP_SECONDS))
+                finally:
+                    db.close()
+            except Exception:
+                logger.exception("Reminder scheduler error")
+                delay = REMINDER_CHECK_INTERVAL_SECONDS
+            # A full batch means a backlog: poll again right away
+            if sent >= REMINDER_BATCH_SIZE:
+                await asyncio.sleep(0)
+                continue
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _stop_reminder_listener(listener)
+
+
+async def _email_dispatch_loop():
+    """Periodically email notifications that have not been emailed yet.
+    Triggers only write Notification rows, so requests never wait on Graph.
+    Each tick claims its batch with SKIP LOCKED, so replicas never double-send;
+    transient failures are retried next tick, permanent ones are marked failed."""
     while True:
         try:
             db = SessionLocal()
             try:
-                sent = ReminderService.process_pending_reminders(db)
-                if sent:
-                    logger.info("Reminder scheduler: sent %d reminder(s)", sent)
+                await NotificationService.dispatch_pending_emails(db)
             finally:
                 db.close()
         except Exception:
-            logger.exception("Reminder scheduler error")
-        await asyncio.sleep(REMINDER_CHECK_INTERVAL_SECONDS)
+            logger.exception("Email dispatch error")
+        await asyncio.sleep(EMAIL_DISPATCH_INTERVAL_SECONDS)
 
 
 @asynccontextmanager
 async def lifespan(application: FastAPI):
     """Startup / shutdown lifecycle."""
-    task = asyncio.create_task(_reminder_loop())
-    logger.info("Reminder background scheduler started (interval=%ds)", REMINDER_CHECK_INTERVAL_SECONDS)
+    tasks = [
+        asyncio.create_task(_reminder_loop()),
+        asyncio.create_task(_email_dispatch_loop()),
+    ]
+    logger.info("Reminder background scheduler started (fallback poll=%ds)", REMINDER_FALLBACK_POLL_SECONDS)
+    logger.info("Email dispatcher started (interval=%ds)", EMAIL_DISPATCH_INTERVAL_SECONDS)
     yield
-    task.cancel()
-    try:
-        await task
-    except asyncio.CancelledError:
-        pass
-    logger.info("Reminder background scheduler stopped")
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    logger.info("Reminder background scheduler and email dispatcher stopped")
+    await close_http_client()
 
 
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
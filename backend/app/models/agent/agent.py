@@ -14,7 +14,7 @@ See app/schemas/agent.py → ProviderConfig* models for the validated shapes.
 import uuid
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, JSON, Boolean, Index
+from sqlalchemy import Column, String, DateTime, Enum as SQLEnum, JSON, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from app.db.session import Base
 
@@ -122,6 +122,11 @@ class Agent(Base):
         Index('idx_agents_type', 'agent_type'),
         Index('idx_agents_status', 'status'),
         Index('idx_agents_provider', 'provider_type'),
+        # One system agent per (name, type); target of the seed upsert
+        Index(
+            'ux_agents_name_type_system', 'name', 'agent_type',
+            unique=True, postgresql_where=text('is_system'),
+        ),
     )
 
     def __repr__(self):
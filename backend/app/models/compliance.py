@@ -20,6 +20,7 @@ from sqlalchemy import (
     Enum as SQLEnum, JSON, Text, Index, ForeignKey,
 )
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.mutable import MutableDict, MutableList
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
@@ -92,15 +93,15 @@ class ComplianceSession(Base):
     notes_filename = Column(String(255), nullable=True)
 
     # Analysis configuration
-    selected_standards = Column(JSON, nullable=True)
+    selected_standards = Column(MutableList.as_mutable(JSON), nullable=True)
     total_standards = Column(Integer, default=0)
     total_questions = Column(Integer, default=0)
 
     # Extracted metadata
-    extracted_metadata = Column(JSON, nullable=True)
+    extracted_metadata = Column(MutableDict.as_mutable(JSON), nullable=True)
 
     # Analysis results
-    analysis_results = Column(JSON, nullable=True)
+    analysis_results = Column(MutableDict.as_mutable(JSON), nullable=True)
     compliance_score = Column(Integer, nullable=True)
     compliant_count = Column(Integer, default=0)
     non_compliant_count = Column(Integer, default=0)
@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Enum, Text, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Text, ForeignKey, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, backref
 from app.db.session import Base
@@ -28,11 +28,24 @@ class Notification(Base):
     link = Column(String(500), nullable=True)
     is_read = Column(Boolean, default=False, nullable=False)
     email_sent = Column(Boolean, default=False, nullable=False)
+    # Graph rejected the email permanently; the dispatcher stops retrying it
+    email_failed = Column(Boolean, default=False, nullable=False, server_default=text("false"))
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", backref=backref("notifications", passive_deletes=True), lazy="joined")
 
+    __table_args__ = (
+        # Per-user inbox listing / unread count, newest first
+        Index("ix_notif_user_unread_created", "user_id", "is_read", created_at.desc()),
+        # Email dispatch scan: rows still awaiting an email, oldest first
+        Index(
+            "ix_notif_pending_dispatch",
+            "created_at",
+            postgresql_where=text("email_sent = false AND email_failed = false AND is_read = false"),
+        ),
+    )
+
 
 class NotificationSetting(Base):
     """Admin-configured email settings for sending notification emails via Outlook."""
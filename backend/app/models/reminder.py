@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Enum, Text, ForeignKey, Integer
+from sqlalchemy import Column, String, Boolean, DateTime, Enum, Text, ForeignKey, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship, backref
 from app.db.session import Base
@@ -84,3 +84,12 @@ class Reminder(Base):
 
     # Relationships
     user = relationship("User", foreign_keys=[user_id], backref=backref("reminders", passive_deletes=True), lazy="joined")
+
+    __table_args__ = (
+        # Scheduler scan: only pending reminders, ordered by due time
+        Index("ix_reminder_due", "remind_at", postgresql_where=text("status = 'PENDING'")),
+        # Per-user listing and counts filtered by status
+        Index("ix_reminder_user_status", "user_id", "status"),
+        # Per-user listing ordered by due time
+        Index("ix_reminder_user_remindat", "user_id", "remind_at"),
+    )
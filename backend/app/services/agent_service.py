@@ -17,6 +17,7 @@ from app.models.agent import (
     AssignmentTaskAgent, AgentAssignmentStatus,
     AgentExecution, ExecutionStatus,
 )
+from app.services.workflow_service import WorkflowService
 
 
 class AgentService:
@@ -154,6 +155,7 @@ class WorkflowTaskAgentService:
             instructions=payload.get("instructions"),
         )
         db.add(wta)
+        WorkflowService.touch_task_workflow(db, task_id)
         db.commit()
         db.refresh(wta)
         return wta
@@ -181,6 +183,7 @@ class WorkflowTaskAgentService:
             if field in payload and payload[field] is not None:
                 setattr(wta, field, payload[field])
 
+        WorkflowService.touch_task_workflow(db, wta.task_id)
         db.commit()
         db.refresh(wta)
         return wta
@@ -191,6 +194,7 @@ class WorkflowTaskAgentService:
         wta = db.query(WorkflowTaskAgent).filter(WorkflowTaskAgent.id == wta_id).first()
         if not wta:
             return False
+        WorkflowService.touch_task_workflow(db, wta.task_id)
         db.delete(wta)
         db.commit()
         return True
@@ -463,6 +463,8 @@ class AssignmentService:
         - Any stage in_progress → assignment = in_progress
         """
         result = {"step": None, "stage": None, "assignment": None}
+        # Completion notifications are collected and inserted in one statement
+        notifications: list[dict] = []
 
         # --- Step level ---
         step = db.query(AssignmentWorkflowStep).filter(
@@ -504,6 +506,7 @@ class AssignmentService:
                             assignment_name=AssignmentService._get_assignment_label(_assignment, db),
                             assigned_to=step.assigned_to,
                             assignment_id=_assignment.id,
+                            batch=notifications,
                         )
                     if _assignment:
                         try:
@@ -543,6 +546,7 @@ class AssignmentService:
             AssignmentWorkflowStage.id == step.stage_id
         ).first()
         if not stage:
+            NotificationService.create_notifications_bulk(db, notifications)
             db.commit()
             return result
 
@@ -574,6 +578,7 @@ class AssignmentService:
                         assignment_name=AssignmentService._get_assignment_label(_assignment_for_stage, db),
                         assigned_to=stage.assigned_to,
                         assignment_id=_assignment_for_stage.id,
+                        batch=notifications,
                     )
                 if _assignment_for_stage:
                     try:
@@ -612,6 +617,7 @@ class AssignmentService:
             WorkflowAssignment.id == stage.assignment_id
         ).first()
         if not assignment:
+            NotificationService.create_notifications_bulk(db, notifications)
             db.commit()
             return result
 
@@ -638,6 +644,7 @@ class AssignmentService:
                         assignment_name=AssignmentService._get_assignment_label(assignment, db),
                         assigned_to=assignment.assigned_by,
                         assignment_id=assignment.id,
+                        batch=notifications,
                     )
                 # Fire automation trigger: assignment completed
                 try:
@@ -656,6 +663,7 @@ class AssignmentService:
                 result["assignment"] = "in_progress"
 
         assignment.updated_at = datetime.utcnow()
+        NotificationService.create_notifications_bulk(db, notifications)
         db.commit()
 
         return result
@@ -10,11 +10,13 @@ Handles:
 import json
 import glob
 import os
+import secrets
+import time
 import uuid
 from datetime import datetime
 from typing import Optional, List
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
-from sqlalchemy.orm.attributes import flag_modified
 
 from app.models.compliance import (
     ComplianceSession,
@@ -30,12 +32,19 @@ DECISION_TREE_DIR = os.path.join(
     "IFRS_decisiontree",
 )
 
+# Value -> enum lookup for request-supplied status strings
+_SESSION_STATUS = {s.value: s for s in ComplianceSessionStatus}
+
+
+_STRIP_SPACES = str.maketrans("", "", " ")
+
 
 def _generate_session_code(client_name: str) -> str:
-    """Generate a session code: RAI-{CLIENT_PREFIX}-{MMDDYYYY}-{SHORT_UUID}"""
-    prefix = client_name[:5].upper().replace(" ", "")
-    date_str = datetime.utcnow().strftime("%m%d%Y")
-    short_id = uuid.uuid4().hex[:4].upper()
+    """Generate a session code: RAI-{CLIENT_PREFIX}-{MMDDYYYY}-{SHORT_ID}"""
+    prefix = client_name[:5].translate(_STRIP_SPACES).upper()
+    t = time.gmtime()
+    date_str = f"{t.tm_mon:02d}{t.tm_mday:02d}{t.tm_year}"
+    short_id = secrets.token_hex(2).upper()
     return f"RAI-{prefix}-{date_str}-{short_id}"
 
 
@@ -106,13 +115,9 @@ class ComplianceSessionService:
         query = db.query(ComplianceSession)
         if created_by:
             query = query.filter(ComplianceSession.created_by == created_by)
-        if status:
-            try:
-                query = query.filter(
-                    ComplianceSession.status == ComplianceSessionStatus(status)
-                )
-            except ValueError:
-                pass
+        status_enum = _SESSION_STATUS.get(status) if status else None
+        if status_enum is not None:
+            query = query.filter(ComplianceSession.status == status_enum)
         if framework:
             query = query.filter(ComplianceSession.framework == framework)
         return query.order_by(ComplianceSession.created_at.desc()).all()
@@ -144,19 +149,14 @@ class ComplianceSessionService:
             "non_compliant_count",
             "not_applicable_count",
         ]
-        # JSON columns need flag_modified to detect in-place mutations
-        json_fields = {"selected_standards", "extracted_metadata", "analysis_results"}
+        # JSON columns are Mutable types, so in-place top-level changes are tracked
         for field in simple_fields:
             if field in payload and payload[field] is not None:
                 setattr(session, field, payload[field])
-                if field in json_fields:
-                    flag_modified(session, field)
 
-        if "status" in payload and payload["status"] is not None:
-            try:
-                session.status = ComplianceSessionStatus(payload["status"])
-            except ValueError:
-                pass
+        status_enum = _SESSION_STATUS.get(payload.get("status"))
+        if status_enum is not None:
+            session.status = status_enum
 
         db.commit()
         db.refresh(session)
@@ -245,14 +245,13 @@ class ComplianceSessionService:
     @staticmethod
     def delete_session(db: Session, session_id: uuid.UUID) -> bool:
         """Delete a compliance session"""
-        session = (
-            db.query(ComplianceSession)
-            .filter(ComplianceSession.id == session_id)
-            .first()
-        )
-        if not session:
+        deleted = db.execute(
+            delete(ComplianceSession)
+            .where(ComplianceSession.id == session_id)
+            .returning(ComplianceSession.id)
+        ).first()
+        if not deleted:
             return False
-        db.delete(session)
         db.commit()
         return True
 
@@ -352,22 +351,28 @@ class DecisionTreeService:
         if cls._cache is not None:
             return cls._cache
 
-        cls._cache = {}
-        pattern = os.path.join(DECISION_TREE_DIR, "*.json")
-        for filepath in sorted(glob.glob(pattern)):
+        files = sorted(glob.glob(os.path.join(DECISION_TREE_DIR, "*.json")))
+        cls._cache = cls._parse_files(files)
+        return cls._cache
+
+    @staticmethod
+    def _parse_files(files: List[str]) -> dict:
+        """Parse decision tree JSON files into the section-keyed cache layout"""
+        cache = {}
+        for filepath in files:
             filename = os.path.basename(filepath)
             with open(filepath, "r", encoding="utf-8") as f:
                 data = json.load(f)
             for section in data.get("sections", []):
                 section_key = section["section"].replace(" ", "_")
-                cls._cache[section_key] = {
+                cache[section_key] = {
                     "section": section["section"],
                     "title": section.get("title", ""),
                     "description": section.get("description", ""),
                     "items": section.get("items", []),
                     "file_name": filename,
                 }
-        return cls._cache
+        return cache
 
     @classmethod
     def reload(cls):
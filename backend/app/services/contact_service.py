@@ -4,7 +4,8 @@ Contact Service - Business logic for contact management
 from uuid import UUID
 from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete, func, update
+from app.db.session import commit_returning
 
 from app.models.contact import Contact, ContactStatus
 from app.models.client_contact import ClientContact
@@ -61,8 +62,17 @@ class ContactService:
                 (Contact.email.ilike(f"%{search}%"))
             )
 
-        total = query.count()
-        contacts = query.order_by(Contact.last_name, Contact.first_name).offset(skip).limit(limit).all()
+        # Window count returns the filtered total alongside the page in one round-trip
+        rows = (
+            query.add_columns(func.count().over().label("total"))
+            .order_by(Contact.last_name, Contact.first_name)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        contacts = [row[0] for row in rows]
+        # A page past the end has no rows to carry the total
+        total = rows[0].total if rows else (query.count() if skip else 0)
 
         result = []
         for contact in contacts:
@@ -85,30 +95,37 @@ class ContactService:
 
     @staticmethod
     def update_contact(contact_id: UUID, data: dict, db: Session) -> Optional[Contact]:
-        contact = db.query(Contact).filter(Contact.id == contact_id).first()
-        if not contact:
-            return None
-
+        values = {}
         for key, value in data.items():
-            if value is not None and hasattr(contact, key):
+            if value is not None and hasattr(Contact, key):
                 if key == "status":
-                    setattr(contact, key, ContactStatus(value))
+                    values[key] = ContactStatus(value)
                 else:
-                    setattr(contact, key, value)
-
-        db.commit()
-        db.refresh(contact)
-        return contact
+                    values[key] = value
+
+        if not values:
+            return ContactService.get_contact(contact_id, db)
+
+        # Single UPDATE ... RETURNING instead of SELECT + UPDATE + refresh
+        return commit_returning(
+            db,
+            update(Contact)
+            .where(Contact.id == contact_id)
+            .values(**values)
+            .returning(Contact),
+        )
 
     @staticmethod
     def delete_contact(contact_id: UUID, db: Session) -> bool:
-        contact = db.query(Contact).filter(Contact.id == contact_id).first()
-        if not contact:
+        # Remove associations first; both deletes share one transaction
+        db.execute(delete(ClientContact).where(ClientContact.contact_id == contact_id))
+        deleted = db.execute(
+            delete(Contact).where(Contact.id == contact_id).returning(Contact.id)
+        ).first()
+        if not deleted:
+            # Unknown contact: undo the association delete as well
+            db.rollback()
             return False
-
-        # Remove associations first
-        db.query(ClientContact).filter(ClientContact.contact_id == contact_id).delete()
-        db.delete(contact)
         db.commit()
         return True
 
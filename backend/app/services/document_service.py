@@ -2,19 +2,42 @@
 Document Service - Business logic for document management
 """
 import os
-import shutil
 from uuid import UUID
 from typing import Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import delete, func, or_, update
+from app.db.session import commit_returning
 from fastapi import UploadFile
+from fastapi.responses import FileResponse
 
 from app.models.document import Document, DocumentStatus, DocumentCategory
 from app.models.user import User
 
 UPLOAD_DIR = "uploads"
 
+# Value -> enum lookups for request-supplied filter strings
+_DOC_STATUS = {s.value: s for s in DocumentStatus}
+_DOC_CATEGORY = {c.value: c for c in DocumentCategory}
+
+# Copy buffer size for uploads
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# "First Last", falling back to email when both name parts are blank
+_USER_DISPLAY_NAME = func.coalesce(
+    func.nullif(func.trim(func.concat_ws(" ", User.first_name, User.last_name)), ""),
+    User.email,
+)
+
+# Read size used when streaming stored files back to clients (Starlette's default is 64 KiB)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class _DocumentFileResponse(FileResponse):
+    """FileResponse that streams stored documents in larger chunks."""
+
+    chunk_size = DOWNLOAD_CHUNK_SIZE
+
 
 class DocumentService:
 
@@ -23,28 +46,52 @@ class DocumentService:
         if not os.path.exists(UPLOAD_DIR):
             os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+    @staticmethod
+    def _copy_upload(src, dst) -> int:
+        """Copy an upload stream to disk through a reused buffer, returning bytes written."""
+        size = 0
+        readinto = getattr(src, "readinto", None)
+        if readinto is None:
+            while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                dst.write(chunk)
+                size += len(chunk)
+            return size
+        # One buffer per call, reused across chunks: concurrent uploads (event
+        # loop or thread pool) never share it
+        buf = bytearray(UPLOAD_CHUNK_SIZE)
+        view = memoryview(buf)
+        while n := readinto(buf):
+            dst.write(view[:n])
+            size += n
+        return size
+
     @staticmethod
     def _extract_file_type(filename: str) -> str:
         """Extract file extension as uppercase type."""
         _, ext = os.path.splitext(filename)
         return ext.lstrip(".").upper() if ext else "UNKNOWN"
 
+    @staticmethod
+    def _get_user_names(user_ids, db: Session) -> dict:
+        """Look up display names for several users in one query, keyed by user id."""
+        ids = {user_id for user_id in user_ids if user_id}
+        if not ids:
+            return {}
+        rows = db.query(User.id, _USER_DISPLAY_NAME).filter(User.id.in_(ids)).all()
+        return dict(rows)
+
     @staticmethod
     def _get_user_name(user_id: UUID, db: Session) -> Optional[str]:
         """Look up a user's display name."""
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            return None
-        parts = []
-        if user.first_name:
-            parts.append(user.first_name)
-        if user.last_name:
-            parts.append(user.last_name)
-        return " ".join(parts) if parts else user.email
+        return DocumentService._get_user_names([user_id], db).get(user_id)
 
     @staticmethod
-    def _serialize_document(doc: Document, db: Session) -> dict:
+    def _serialize_document(doc: Document, db: Session, user_names: Optional[dict] = None) -> dict:
         """Convert a Document model to a response dict with uploader name."""
+        if user_names is not None:
+            uploaded_by_name = user_names.get(doc.uploaded_by)
+        else:
+            uploaded_by_name = DocumentService._get_user_name(doc.uploaded_by, db)
         return {
             "id": str(doc.id),
             "name": doc.name,
@@ -60,7 +107,7 @@ class DocumentService:
             "reviewed_by": str(doc.reviewed_by) if doc.reviewed_by else None,
             "reviewed_at": doc.reviewed_at.isoformat() if doc.reviewed_at else None,
             "uploaded_by": str(doc.uploaded_by),
-            "uploaded_by_name": DocumentService._get_user_name(doc.uploaded_by, db),
+            "uploaded_by_name": uploaded_by_name,
             "created_at": doc.created_at.isoformat(),
             "updated_at": doc.updated_at.isoformat(),
         }
@@ -84,15 +131,9 @@ class DocumentService:
 
         # Save file to disk
         with open(storage_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            file_size = DocumentService._copy_upload(file.file, buffer)
 
-        file_size = os.path.getsize(storage_path)
-
-        category_value = metadata.get("category", "other")
-        try:
-            category = DocumentCategory(category_value)
-        except ValueError:
-            category = DocumentCategory.OTHER
+        category = _DOC_CATEGORY.get(metadata.get("category", "other"), DocumentCategory.OTHER)
 
         doc = Document(
             name=metadata.get("name") or file.filename or "Untitled",
@@ -117,6 +158,36 @@ class DocumentService:
     def get_document(document_id: UUID, db: Session) -> Optional[Document]:
         return db.query(Document).filter(Document.id == document_id).first()
 
+    @staticmethod
+    def open_for_send(doc: Document) -> Optional[os.stat_result]:
+        """Stat a document's stored file, returning None if it is missing on disk."""
+        if not doc.storage_path:
+            return None
+        try:
+            return os.stat(doc.storage_path)
+        except OSError:
+            return None
+
+    @staticmethod
+    def stream_document(doc: Document) -> Optional[FileResponse]:
+        """
+        Build a streaming download response for a document's stored file.
+
+        The stat result is handed to the response so the file is not stat'ed
+        twice, and servers supporting the ASGI pathsend extension can hand the
+        path straight to the kernel (sendfile) instead of copying in userspace.
+        Returns None if the file is missing on disk.
+        """
+        stat_result = DocumentService.open_for_send(doc)
+        if stat_result is None:
+            return None
+        return _DocumentFileResponse(
+            path=doc.storage_path,
+            filename=doc.original_filename,
+            media_type=doc.content_type or "application/octet-stream",
+            stat_result=stat_result,
+        )
+
     @staticmethod
     def get_documents(
         db: Session,
@@ -129,19 +200,13 @@ class DocumentService:
         """List documents with optional filtering, search, and pagination."""
         query = db.query(Document)
 
-        if status:
-            try:
-                status_enum = DocumentStatus(status)
-                query = query.filter(Document.status == status_enum)
-            except ValueError:
-                pass
+        status_enum = _DOC_STATUS.get(status) if status else None
+        if status_enum is not None:
+            query = query.filter(Document.status == status_enum)
 
-        if category:
-            try:
-                category_enum = DocumentCategory(category)
-                query = query.filter(Document.category == category_enum)
-            except ValueError:
-                pass
+        category_enum = _DOC_CATEGORY.get(category) if category else None
+        if category_enum is not None:
+            query = query.filter(Document.category == category_enum)
 
         if search:
             search_pattern = f"%{search}%"
@@ -154,56 +219,78 @@ class DocumentService:
                 )
             )
 
-        total = query.count()
-        documents = query.order_by(Document.created_at.desc()).offset(skip).limit(limit).all()
+        # Window count returns the filtered total alongside the page in one round-trip
+        rows = (
+            query.add_columns(func.count().over().label("total"))
+            .order_by(Document.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        documents = [row[0] for row in rows]
+        # A page past the end has no rows to carry the total
+        total = rows[0].total if rows else (query.count() if skip else 0)
 
-        result = []
-        for doc in documents:
-            result.append(DocumentService._serialize_document(doc, db))
+        user_names = DocumentService._get_user_names((doc.uploaded_by for doc in documents), db)
+        result = [DocumentService._serialize_document(doc, db, user_names) for doc in documents]
 
         return {"documents": result, "total": total, "skip": skip, "limit": limit}
 
     @staticmethod
     def update_document(document_id: UUID, data: dict, db: Session, reviewer_id: Optional[UUID] = None) -> Optional[Document]:
         """Update document metadata and/or status."""
-        doc = db.query(Document).filter(Document.id == document_id).first()
-        if not doc:
-            return None
-
+        values = {}
         for key, value in data.items():
-            if value is not None and hasattr(doc, key):
+            if value is not None and hasattr(Document, key):
                 if key == "status":
-                    new_status = DocumentStatus(value)
-                    setattr(doc, key, new_status)
+                    new_status = _DOC_STATUS.get(value)
+                    if new_status is None:
+                        raise ValueError(f"{value!r} is not a valid DocumentStatus")
+                    values[key] = new_status
                     # Auto-set reviewer when status changes to reviewed
                     if new_status == DocumentStatus.REVIEWED and reviewer_id:
-                        doc.reviewed_by = reviewer_id
-                        doc.reviewed_at = datetime.utcnow()
+                        values["reviewed_by"] = reviewer_id
+                        values["reviewed_at"] = datetime.utcnow()
                 elif key == "category":
-                    setattr(doc, key, DocumentCategory(value))
+                    new_category = _DOC_CATEGORY.get(value)
+                    if new_category is None:
+                        raise ValueError(f"{value!r} is not a valid DocumentCategory")
+                    values[key] = new_category
                 else:
-                    setattr(doc, key, value)
+                    values[key] = value
 
-        db.commit()
-        db.refresh(doc)
-        return doc
+        if not values:
+            return DocumentService.get_document(document_id, db)
+
+        # Single UPDATE ... RETURNING instead of SELECT + UPDATE + refresh
+        return commit_returning(
+            db,
+            update(Document)
+            .where(Document.id == document_id)
+            .values(**values)
+            .returning(Document),
+        )
 
     @staticmethod
     def delete_document(document_id: UUID, db: Session) -> bool:
         """Delete a document record and its file from disk."""
-        doc = db.query(Document).filter(Document.id == document_id).first()
-        if not doc:
+        storage_path = db.execute(
+            delete(Document)
+            .where(Document.id == document_id)
+            .returning(Document.storage_path)
+        ).first()
+        if not storage_path:
             return False
+        db.commit()
 
         # Remove file from disk if it exists
-        if doc.storage_path and os.path.exists(doc.storage_path):
+        storage_path = storage_path[0]
+        if storage_path and os.path.exists(storage_path):
             try:
-                os.remove(doc.storage_path)
+                os.remove(storage_path)
             except OSError:
                 pass
 
-        db.delete(doc)
-        db.commit()
         return True
 
     @staticmethod
@@ -1,9 +1,17 @@
+import asyncio
+import hashlib
 import logging
-from datetime import datetime
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from uuid import UUID
 from typing import Optional
 import httpx
-from sqlalchemy.orm import Session
+from cachetools import TTLCache
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session, lazyload
 
 from app.models.notification import (
     Notification,
@@ -15,6 +23,171 @@ from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
+# Graph access tokens keyed by (client_id, tenant_id). Each entry holds
+# (token, monotonic expiry) taken from the token's own expires_in; the cache
+# TTL is only an upper bound.
+_TOKEN_CACHE: TTLCache = TTLCache(maxsize=32, ttl=3000)
+_TOKEN_LOCK = asyncio.Lock()
+TOKEN_EXPIRY_MARGIN_SECONDS = 60
+
+# Single-row admin email config, cached per process as an immutable snapshot.
+# upsert_settings invalidates the local entry; other workers pick up changes
+# within the TTL.
+_SETTINGS_CACHE: TTLCache = TTLCache(maxsize=1, ttl=300)
+_SETTINGS_CACHE_KEY = "settings"
+_SETTINGS_CACHE_LOCK = threading.Lock()
+
+# Per-user unread counts, cached briefly for the badge poll. Writes through
+# this process invalidate the entry once they commit. Writes from other
+# processes (the reminder scheduler on another worker, other replicas) are not
+# seen, so the badge can lag them by up to the TTL.
+_UNREAD_COUNT_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=15)
+_UNREAD_COUNT_LOCK = threading.Lock()
+# Bumped on every invalidation; a count read from the DB is only cached if no
+# invalidation happened meanwhile, so a pre-commit read can't be stored
+_unread_count_epoch = 0
+# Key in Session.info for users whose unread count changes on commit
+_PENDING_UNREAD_KEY = "pending_unread_count_users"
+
+# Trigger link and message templates
+_ASSIGNMENT_LINK_FMT = "/dashboard/assignments/{}"
+_MSG_TASK_COMPLETED = 'Task "{}" in assignment "{}" has been completed.'
+_MSG_STEP_COMPLETED = 'Step "{}" in assignment "{}" has been completed.'
+_MSG_STAGE_COMPLETED = 'Stage "{}" in assignment "{}" has been completed.'
+_MSG_ASSIGNMENT_COMPLETED = 'Assignment "{}" has been fully completed.'
+_MSG_TASK_ASSIGNED = 'You have been assigned task "{}" in assignment "{}".'
+_MSG_TASK_CREATED = 'Task "{}" has been created in workflow "{}".'
+
+# Recently committed notifications, so a trigger fired twice for the same
+# event (retries, nested transactions) does not write a duplicate row and
+# email. Keys are staged on the Session and only recorded after commit, so a
+# rolled-back notification can be retried straight away.
+_RECENT_NOTIFICATIONS: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+# Sync endpoints run on a thread pool and TTLCache is not thread-safe
+_RECENT_NOTIFICATIONS_LOCK = threading.Lock()
+# Key in Session.info for the dedup keys of not-yet-committed notifications
+_PENDING_DEDUP_KEY = "pending_notification_keys"
+
+# Key in Session.info for the per-session {user_id: preference} map
+_PREF_CACHE_KEY = "notification_preferences"
+
+GRAPH_BATCH_URL = "https://graph.microsoft.com/v1.0/$batch"
+GRAPH_BATCH_SIZE = 20  # Graph's per-request limit for JSON batching
+GRAPH_BATCH_MAX_ATTEMPTS = 3
+GRAPH_MAX_RETRY_AFTER_SECONDS = 30
+GRAPH_DEFAULT_RETRY_AFTER_SECONDS = 1
+GRAPH_MAX_CONCURRENT_REQUESTS = 10
+# 4xx statuses worth retrying on a later dispatch; any other 4xx is permanent
+GRAPH_RETRYABLE_CLIENT_STATUSES = frozenset({408, 429})
+
+EMAIL_DISPATCH_BATCH_SIZE = 50
+# Older notifications are never emailed, so a backlog (or the first deploy
+# of the dispatcher) does not mail out stale history
+EMAIL_DISPATCH_MAX_AGE = timedelta(hours=24)
+
+# Shared client so token and sendMail calls reuse pooled keep-alive connections
+_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None or _HTTP_CLIENT.is_closed:
+        _HTTP_CLIENT = httpx.AsyncClient(
+            timeout=15.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+        )
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called on application shutdown)."""
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is not None:
+        await _HTTP_CLIENT.aclose()
+        _HTTP_CLIENT = None
+
+
+@dataclass(frozen=True)
+class NotificationSettingSnapshot:
+    """Read-only copy of the NotificationSetting row, safe to share across threads."""
+    id: UUID
+    outlook_email: str
+    outlook_client_id: str
+    outlook_client_secret: str
+    outlook_tenant_id: str
+    is_enabled: bool
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, settings: NotificationSetting) -> "NotificationSettingSnapshot":
+        return cls(
+            id=settings.id,
+            outlook_email=settings.outlook_email,
+            outlook_client_id=settings.outlook_client_id,
+            outlook_client_secret=settings.outlook_client_secret,
+            outlook_tenant_id=settings.outlook_tenant_id,
+            is_enabled=settings.is_enabled,
+            created_at=settings.created_at,
+            updated_at=settings.updated_at,
+        )
+
+
+def _parse_retry_after(value) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)."""
+    if value is None:
+        return GRAPH_DEFAULT_RETRY_AFTER_SECONDS
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return GRAPH_DEFAULT_RETRY_AFTER_SECONDS
+
+
+def _dedup_key(user_id: UUID, notification_type: NotificationType, link: Optional[str], message: str) -> tuple:
+    digest = hashlib.blake2b(message.encode(), digest_size=8).digest()
+    return (user_id, notification_type, link, digest)
+
+
+def _is_duplicate(db: Session, key: tuple) -> bool:
+    """True if the notification was committed recently or is pending in this Session."""
+    if key in db.info.get(_PENDING_DEDUP_KEY, ()):
+        return True
+    with _RECENT_NOTIFICATIONS_LOCK:
+        return key in _RECENT_NOTIFICATIONS
+
+
+def _invalidate_unread_counts(user_ids) -> None:
+    global _unread_count_epoch
+    with _UNREAD_COUNT_LOCK:
+        _unread_count_epoch += 1
+        for user_id in user_ids:
+            _UNREAD_COUNT_CACHE.pop(user_id, None)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_committed_notifications(session: Session) -> None:
+    keys = session.info.pop(_PENDING_DEDUP_KEY, None)
+    if keys:
+        with _RECENT_NOTIFICATIONS_LOCK:
+            for key in keys:
+                _RECENT_NOTIFICATIONS[key] = True
+    user_ids = session.info.pop(_PENDING_UNREAD_KEY, None)
+    if user_ids:
+        _invalidate_unread_counts(user_ids)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted_notifications(session: Session, transaction) -> None:
+    # Runs after after_commit; on rollback or close the staged state is dropped
+    if transaction.parent is None:
+        session.info.pop(_PENDING_DEDUP_KEY, None)
+        session.info.pop(_PENDING_UNREAD_KEY, None)
+
 
 class NotificationService:
     """Service for creating in-app notifications and sending Outlook emails."""
@@ -30,7 +203,15 @@ class NotificationService:
         message: str,
         link: Optional[str] = None,
     ) -> Optional[Notification]:
-        """Create an in-app notification if user preferences allow it."""
+        """Create an in-app notification if user preferences allow it.
+
+        Returns None if preferences disable it or an identical notification
+        was created in the last minute.
+        """
+        key = _dedup_key(user_id, notification_type, link, message)
+        if _is_duplicate(db, key):
+            return None
+
         pref = NotificationService._get_or_create_preference(db, user_id)
         if not pref.in_app_enabled:
             return None
@@ -46,8 +227,66 @@ class NotificationService:
         )
         db.add(notification)
         db.flush()
+        db.info.setdefault(_PENDING_DEDUP_KEY, set()).add(key)
+        db.info.setdefault(_PENDING_UNREAD_KEY, set()).add(user_id)
         return notification
 
+    @staticmethod
+    def create_notifications_bulk(db: Session, entries: list[dict], dedup: bool = True) -> int:
+        """
+        Insert several in-app notifications in one statement.
+
+        entries: dicts with user_id, type, title, message and link. Entries for
+        users with in-app notifications disabled are dropped, as are (when
+        dedup is set) duplicates of a notification created in the last minute.
+        Returns the number of notifications inserted.
+        """
+        rows = []
+        keys = set()
+        for entry in entries:
+            key = _dedup_key(entry["user_id"], entry["type"], entry["link"], entry["message"])
+            if dedup and (key in keys or _is_duplicate(db, key)):
+                continue
+            if not NotificationService._get_or_create_preference(db, entry["user_id"]).in_app_enabled:
+                continue
+            keys.add(key)
+            rows.append({**entry, "is_read": False, "email_sent": False})
+
+        if rows:
+            db.execute(insert(Notification), rows)
+            db.info.setdefault(_PENDING_DEDUP_KEY, set()).update(keys)
+            db.info.setdefault(_PENDING_UNREAD_KEY, set()).update(row["user_id"] for row in rows)
+        return len(rows)
+
+    @staticmethod
+    def _emit(
+        db: Session,
+        batch: Optional[list[dict]],
+        user_id: UUID,
+        notification_type: NotificationType,
+        title: str,
+        message: str,
+        link: Optional[str],
+    ) -> Optional[Notification]:
+        """Create a notification now, or queue it on batch for create_notifications_bulk."""
+        if batch is not None:
+            batch.append({
+                "user_id": user_id,
+                "type": notification_type,
+                "title": title,
+                "message": message,
+                "link": link,
+            })
+            return None
+        return NotificationService.create_notification(
+            db=db,
+            user_id=user_id,
+            notification_type=notification_type,
+            title=title,
+            message=message,
+            link=link,
+        )
+
     @staticmethod
     def get_user_notifications(
         db: Session,
@@ -63,17 +302,28 @@ class NotificationService:
 
     @staticmethod
     def get_unread_count(db: Session, user_id: UUID) -> int:
-        return db.query(Notification).filter(
-            Notification.user_id == user_id,
-            Notification.is_read == False,
-        ).count()
+        with _UNREAD_COUNT_LOCK:
+            count = _UNREAD_COUNT_CACHE.get(user_id)
+            epoch = _unread_count_epoch
+        if count is None:
+            count = db.query(Notification).filter(
+                Notification.user_id == user_id,
+                Notification.is_read == False,
+            ).count()
+            with _UNREAD_COUNT_LOCK:
+                if epoch == _unread_count_epoch:
+                    _UNREAD_COUNT_CACHE[user_id] = count
+        return count
 
     @staticmethod
     def mark_as_read(db: Session, notification_ids: list[UUID], user_id: UUID) -> int:
+        if not notification_ids:
+            return 0
         count = db.query(Notification).filter(
             Notification.id.in_(notification_ids),
             Notification.user_id == user_id,
-        ).update({"is_read": True}, synchronize_session="fetch")
+        ).update({"is_read": True}, synchronize_session=False)
+        db.info.setdefault(_PENDING_UNREAD_KEY, set()).add(user_id)
         db.commit()
         return count
 
@@ -82,7 +332,8 @@ class NotificationService:
         count = db.query(Notification).filter(
             Notification.user_id == user_id,
             Notification.is_read == False,
-        ).update({"is_read": True}, synchronize_session="fetch")
+        ).update({"is_read": True}, synchronize_session=False)
+        db.info.setdefault(_PENDING_UNREAD_KEY, set()).add(user_id)
         db.commit()
         return count
 
@@ -100,7 +351,7 @@ class NotificationService:
         if not pref.email_enabled:
             return False
 
-        settings = db.query(NotificationSetting).first()
+        settings = NotificationService.get_settings(db)
         if not settings or not settings.is_enabled:
             logger.info("Email notifications disabled or no settings configured")
             return False
@@ -134,22 +385,41 @@ class NotificationService:
     async def _get_graph_access_token(
         client_id: str, client_secret: str, tenant_id: str
     ) -> Optional[str]:
-        """Get OAuth2 access token from Microsoft identity platform."""
-        token_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
-        data = {
-            "client_id": client_id,
-            "client_secret": client_secret,
-            "scope": "https://graph.microsoft.com/.default",
-            "grant_type": "client_credentials",
-        }
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(token_url, data=data)
+        """Get OAuth2 access token from Microsoft identity platform (cached until near expiry)."""
+        key = (client_id, tenant_id)
+        cached = _TOKEN_CACHE.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        # Serialize refreshes so a burst of sends fetches one token, not one each
+        async with _TOKEN_LOCK:
+            cached = _TOKEN_CACHE.get(key)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+
+            token_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
+            data = {
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "scope": "https://graph.microsoft.com/.default",
+                "grant_type": "client_credentials",
+            }
+            try:
+                response = await _get_http_client().post(token_url, data=data)
                 response.raise_for_status()
-                return response.json().get("access_token")
-        except Exception as e:
-            logger.error(f"Failed to get Graph API access token: {e}")
-            return None
+                token_data = response.json()
+            except Exception as e:
+                logger.error(f"Failed to get Graph API access token: {e}")
+                return None
+
+            access_token = token_data.get("access_token")
+            if access_token:
+                expires_in = int(token_data.get("expires_in", 3600))
+                _TOKEN_CACHE[key] = (
+                    access_token,
+                    time.monotonic() + expires_in - TOKEN_EXPIRY_MARGIN_SECONDS,
+                )
+            return access_token
 
     @staticmethod
     async def _send_via_graph(
@@ -165,7 +435,15 @@ class NotificationService:
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json",
         }
-        payload = {
+        payload = NotificationService._build_mail_payload(to_email, subject, body)
+        response = await _get_http_client().post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        logger.info(f"Email sent to {to_email} from {from_email}")
+
+    @staticmethod
+    def _build_mail_payload(to_email: str, subject: str, body: str) -> dict:
+        """Build the sendMail request body for a single HTML email."""
+        return {
             "message": {
                 "subject": subject,
                 "body": {
@@ -178,10 +456,82 @@ class NotificationService:
             },
             "saveToSentItems": "true",
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            logger.info(f"Email sent to {to_email} from {from_email}")
+
+    @staticmethod
+    async def _send_batch_via_graph(
+        access_token: str,
+        from_email: str,
+        messages: list[tuple[str, str, str]],
+    ) -> tuple[list[bool], list[bool]]:
+        """
+        Send up to GRAPH_BATCH_SIZE emails in one Graph JSON $batch request.
+
+        messages: (to_email, subject, body) tuples.
+        Returns per-message (sent, failed) flags; failed marks permanent
+        rejections (4xx other than 408/429) that retrying will not fix.
+        Sub-requests throttled with 429 are retried after their Retry-After
+        delay. If a batch request itself fails, the flags gathered so far are
+        returned so messages Graph already accepted are not sent again.
+        """
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json",
+        }
+        requests = {
+            str(i): {
+                "id": str(i),
+                "method": "POST",
+                "url": f"/users/{from_email}/sendMail",
+                "headers": {"Content-Type": "application/json"},
+                "body": NotificationService._build_mail_payload(to_email, subject, body),
+            }
+            for i, (to_email, subject, body) in enumerate(messages)
+        }
+        sent = [False] * len(messages)
+        failed = [False] * len(messages)
+
+        for attempt in range(GRAPH_BATCH_MAX_ATTEMPTS):
+            try:
+                response = await _get_http_client().post(
+                    GRAPH_BATCH_URL, json={"requests": list(requests.values())}, headers=headers
+                )
+                response.raise_for_status()
+                responses = response.json().get("responses", [])
+            except (httpx.HTTPError, ValueError) as e:
+                logger.error(f"Graph batch request failed on attempt {attempt + 1}: {e}")
+                break
+
+            throttled = {}
+            retry_after = 0.0
+            for sub in responses:
+                request_id = sub.get("id")
+                status = sub.get("status")
+                if request_id not in requests:
+                    continue
+                if status in (200, 202):
+                    sent[int(request_id)] = True
+                elif status == 429:
+                    throttled[request_id] = requests[request_id]
+                    retry_after = max(
+                        retry_after,
+                        _parse_retry_after((sub.get("headers") or {}).get("Retry-After")),
+                    )
+                else:
+                    logger.error(f"Graph sendMail sub-request {request_id} failed with status {status}")
+                    if (
+                        isinstance(status, int)
+                        and 400 <= status < 500
+                        and status not in GRAPH_RETRYABLE_CLIENT_STATUSES
+                    ):
+                        failed[int(request_id)] = True
+
+            if not throttled or attempt == GRAPH_BATCH_MAX_ATTEMPTS - 1:
+                break
+            requests = throttled
+            await asyncio.sleep(min(retry_after, GRAPH_MAX_RETRY_AFTER_SECONDS))
+
+        logger.info(f"Graph batch sent {sum(sent)}/{len(messages)} emails from {from_email}")
+        return sent, failed
 
     # ─── Notification Triggers ───
 
@@ -192,22 +542,21 @@ class NotificationService:
         assignment_name: str,
         assigned_to: Optional[UUID] = None,
         assignment_id: Optional[UUID] = None,
+        batch: Optional[list[dict]] = None,
     ) -> None:
         """Trigger notification when a task is completed."""
         if not assigned_to:
             return
-        link = f"/dashboard/assignments/{assignment_id}" if assignment_id else None
-        notification = NotificationService.create_notification(
-            db=db,
+        link = _ASSIGNMENT_LINK_FMT.format(assignment_id) if assignment_id else None
+        NotificationService._emit(
+            db,
+            batch,
             user_id=assigned_to,
             notification_type=NotificationType.TASK_COMPLETED,
             title="Task Completed",
-            message=f'Task "{task_name}" in assignment "{assignment_name}" has been completed.',
+            message=_MSG_TASK_COMPLETED.format(task_name, assignment_name),
             link=link,
         )
-        if notification:
-            notification.email_sent = False
-            db.flush()
 
     @staticmethod
     def notify_step_completed(
@@ -216,17 +565,19 @@ class NotificationService:
         assignment_name: str,
         assigned_to: Optional[UUID] = None,
         assignment_id: Optional[UUID] = None,
+        batch: Optional[list[dict]] = None,
     ) -> None:
         """Trigger notification when a step is completed."""
         if not assigned_to:
             return
-        link = f"/dashboard/assignments/{assignment_id}" if assignment_id else None
-        NotificationService.create_notification(
-            db=db,
+        link = _ASSIGNMENT_LINK_FMT.format(assignment_id) if assignment_id else None
+        NotificationService._emit(
+            db,
+            batch,
             user_id=assigned_to,
             notification_type=NotificationType.STEP_COMPLETED,
             title="Step Completed",
-            message=f'Step "{step_name}" in assignment "{assignment_name}" has been completed.',
+            message=_MSG_STEP_COMPLETED.format(step_name, assignment_name),
             link=link,
         )
 
@@ -237,17 +588,19 @@ class NotificationService:
         assignment_name: str,
         assigned_to: Optional[UUID] = None,
         assignment_id: Optional[UUID] = None,
+        batch: Optional[list[dict]] = None,
     ) -> None:
         """Trigger notification when a stage is completed."""
         if not assigned_to:
             return
-        link = f"/dashboard/assignments/{assignment_id}" if assignment_id else None
-        NotificationService.create_notification(
-            db=db,
+        link = _ASSIGNMENT_LINK_FMT.format(assignment_id) if assignment_id else None
+        NotificationService._emit(
+            db,
+            batch,
             user_id=assigned_to,
             notification_type=NotificationType.STAGE_COMPLETED,
             title="Stage Completed",
-            message=f'Stage "{stage_name}" in assignment "{assignment_name}" has been completed.',
+            message=_MSG_STAGE_COMPLETED.format(stage_name, assignment_name),
             link=link,
         )
 
@@ -257,17 +610,19 @@ class NotificationService:
         assignment_name: str,
         assigned_to: Optional[UUID] = None,
         assignment_id: Optional[UUID] = None,
+        batch: Optional[list[dict]] = None,
     ) -> None:
         """Trigger notification when an entire assignment is completed."""
         if not assigned_to:
             return
-        link = f"/dashboard/assignments/{assignment_id}" if assignment_id else None
-        NotificationService.create_notification(
-            db=db,
+        link = _ASSIGNMENT_LINK_FMT.format(assignment_id) if assignment_id else None
+        NotificationService._emit(
+            db,
+            batch,
             user_id=assigned_to,
             notification_type=NotificationType.ASSIGNMENT_COMPLETED,
             title="Assignment Completed",
-            message=f'Assignment "{assignment_name}" has been fully completed.',
+            message=_MSG_ASSIGNMENT_COMPLETED.format(assignment_name),
             link=link,
         )
 
@@ -280,13 +635,13 @@ class NotificationService:
         assignment_id: Optional[UUID] = None,
     ) -> None:
         """Trigger notification when a task is assigned to a user."""
-        link = f"/dashboard/assignments/{assignment_id}" if assignment_id else None
+        link = _ASSIGNMENT_LINK_FMT.format(assignment_id) if assignment_id else None
         NotificationService.create_notification(
             db=db,
             user_id=assigned_to,
             notification_type=NotificationType.TASK_ASSIGNED,
             title="Task Assigned",
-            message=f'You have been assigned task "{task_name}" in assignment "{assignment_name}".',
+            message=_MSG_TASK_ASSIGNED.format(task_name, assignment_name),
             link=link,
         )
 
@@ -303,15 +658,26 @@ class NotificationService:
             user_id=created_by,
             notification_type=NotificationType.TASK_CREATED,
             title="Task Created",
-            message=f'Task "{task_name}" has been created in workflow "{workflow_name}".',
+            message=_MSG_TASK_CREATED.format(task_name, workflow_name),
             link=None,
         )
 
     # ─── Notification Settings (Admin) ───
 
     @staticmethod
-    def get_settings(db: Session) -> Optional[NotificationSetting]:
-        return db.query(NotificationSetting).first()
+    def get_settings(db: Session) -> Optional[NotificationSettingSnapshot]:
+        """Return a snapshot of the notification settings row (cached for a few minutes)."""
+        with _SETTINGS_CACHE_LOCK:
+            snapshot = _SETTINGS_CACHE.get(_SETTINGS_CACHE_KEY)
+        if snapshot is not None:
+            return snapshot
+        settings = db.query(NotificationSetting).first()
+        if not settings:
+            return None
+        snapshot = NotificationSettingSnapshot.from_model(settings)
+        with _SETTINGS_CACHE_LOCK:
+            _SETTINGS_CACHE[_SETTINGS_CACHE_KEY] = snapshot
+        return snapshot
 
     @staticmethod
     def upsert_settings(db: Session, data: dict) -> NotificationSetting:
@@ -325,6 +691,8 @@ class NotificationService:
             settings = NotificationSetting(**data)
             db.add(settings)
         db.commit()
+        with _SETTINGS_CACHE_LOCK:
+            _SETTINGS_CACHE.pop(_SETTINGS_CACHE_KEY, None)
         db.refresh(settings)
         return settings
 
@@ -334,6 +702,13 @@ class NotificationService:
     def _get_or_create_preference(
         db: Session, user_id: UUID
     ) -> UserNotificationPreference:
+        # Memoized on the Session (one per request via get_db), so a burst of
+        # notifications to the same user looks the row up once
+        prefs = db.info.setdefault(_PREF_CACHE_KEY, {})
+        pref = prefs.get(user_id)
+        if pref is not None:
+            return pref
+
         pref = db.query(UserNotificationPreference).filter(
             UserNotificationPreference.user_id == user_id
         ).first()
@@ -345,6 +720,7 @@ class NotificationService:
             )
             db.add(pref)
             db.flush()
+        prefs[user_id] = pref
         return pref
 
     @staticmethod
@@ -376,38 +752,132 @@ class NotificationService:
         db: Session, skip: int = 0, limit: int = 100
     ) -> list[dict]:
         """Get all users with their notification preferences (admin view)."""
-        users = db.query(User).filter(User.is_active == True).offset(skip).limit(limit).all()
+        rows = (
+            db.query(
+                User.id,
+                User.first_name,
+                User.last_name,
+                User.email,
+                UserNotificationPreference.email_enabled,
+                UserNotificationPreference.in_app_enabled,
+            )
+            .outerjoin(
+                UserNotificationPreference,
+                UserNotificationPreference.user_id == User.id,
+            )
+            .filter(User.is_active == True)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
         result = []
-        for user in users:
-            pref = NotificationService._get_or_create_preference(db, user.id)
+        missing_prefs = []
+        for user_id, first_name, last_name, email, email_enabled, in_app_enabled in rows:
+            if email_enabled is None:
+                # No preference row yet — create the default one
+                missing_prefs.append(UserNotificationPreference(
+                    user_id=user_id,
+                    email_enabled=True,
+                    in_app_enabled=True,
+                ))
+                email_enabled = in_app_enabled = True
             result.append({
-                "user_id": str(user.id),
-                "first_name": user.first_name,
-                "last_name": user.last_name,
-                "email": user.email,
-                "email_enabled": pref.email_enabled,
-                "in_app_enabled": pref.in_app_enabled,
+                "user_id": str(user_id),
+                "first_name": first_name,
+                "last_name": last_name,
+                "email": email,
+                "email_enabled": email_enabled,
+                "in_app_enabled": in_app_enabled,
             })
-        db.commit()
+
+        if missing_prefs:
+            db.bulk_save_objects(missing_prefs)
+            db.commit()
         return result
 
     # ─── Async email dispatch (called after commit) ───
 
     @staticmethod
     async def dispatch_pending_emails(db: Session) -> None:
-        """Send emails for notifications that haven't been emailed yet."""
-        pending = db.query(Notification).filter(
-            Notification.email_sent == False,
-            Notification.is_read == False,
-        ).limit(50).all()
-
-        for notification in pending:
-            sent = await NotificationService.send_email_notification(
-                db=db,
-                user_id=notification.user_id,
-                subject=notification.title,
-                body=notification.message,
+        """
+        Send emails for notifications that haven't been emailed yet, batched via Graph $batch.
+
+        The batch is claimed with FOR UPDATE SKIP LOCKED and held until the
+        final commit, so concurrent dispatchers (other workers or replicas)
+        never pick up the same rows. Rows Graph rejects permanently are marked
+        email_failed; recipients without an address or with email disabled
+        are filtered out so they never occupy the batch window.
+        """
+        cutoff = datetime.utcnow() - EMAIL_DISPATCH_MAX_AGE
+        # One query for the pending rows plus each recipient's email; the
+        # Session is not used again once sends start
+        rows = (
+            db.query(Notification, User.email)
+            .join(User, User.id == Notification.user_id)
+            .outerjoin(
+                UserNotificationPreference,
+                UserNotificationPreference.user_id == Notification.user_id,
             )
-            if sent:
-                notification.email_sent = True
+            .options(lazyload(Notification.user))
+            .filter(
+                Notification.email_sent == False,
+                Notification.email_failed == False,
+                Notification.is_read == False,
+                Notification.created_at >= cutoff,
+                User.email.isnot(None),
+                User.email != "",
+                # A missing preference row means the default (email enabled)
+                UserNotificationPreference.email_enabled.isnot(False),
+            )
+            .order_by(Notification.created_at)
+            .limit(EMAIL_DISPATCH_BATCH_SIZE)
+            .with_for_update(of=Notification, skip_locked=True)
+            .all()
+        )
+        if not rows:
+            db.rollback()
+            return
+
+        settings = NotificationService.get_settings(db)
+        if not settings or not settings.is_enabled:
+            logger.info("Email notifications disabled or no settings configured")
+            db.rollback()
+            return
+
+        access_token = await NotificationService._get_graph_access_token(
+            settings.outlook_client_id,
+            settings.outlook_client_secret,
+            settings.outlook_tenant_id,
+        )
+        if not access_token:
+            db.rollback()
+            return
+
+        chunks = [
+            rows[start:start + GRAPH_BATCH_SIZE]
+            for start in range(0, len(rows), GRAPH_BATCH_SIZE)
+        ]
+        semaphore = asyncio.Semaphore(GRAPH_MAX_CONCURRENT_REQUESTS)
+
+        async def send_chunk(chunk: list[tuple[Notification, str]]) -> tuple[list[bool], list[bool]]:
+            async with semaphore:
+                return await NotificationService._send_batch_via_graph(
+                    access_token=access_token,
+                    from_email=settings.outlook_email,
+                    messages=[(email, n.title, n.message) for n, email in chunk],
+                )
+
+        results = await asyncio.gather(
+            *(send_chunk(chunk) for chunk in chunks), return_exceptions=True
+        )
+        for chunk, chunk_results in zip(chunks, results):
+            if isinstance(chunk_results, BaseException):
+                logger.error(f"Failed to send email notification batch: {chunk_results}")
+                continue
+            for (notification, _), sent, failed in zip(chunk, *chunk_results):
+                if sent:
+                    notification.email_sent = True
+                elif failed:
+                    notification.email_failed = True
         db.commit()
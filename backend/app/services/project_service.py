@@ -3,7 +3,8 @@ Project Business Logic Service - Kanban Operations
 """
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from uuid import UUID
 from typing import Dict, List
 
@@ -11,8 +12,12 @@ from app.models import (
     Project,
     ProjectTask,
     ProjectCollaborator,
+    CollaboratorRole,
 )
 
+# Collaborator roles ordered by privilege, lowest first
+_ROLE_RANK = {"viewer": 0, "commenter": 1, "editor": 2, "owner": 3}
+
 
 class ProjectService:
     """Service for managing projects and Kanban boards"""
@@ -23,7 +28,19 @@ class ProjectService:
         Get all tasks for a project, grouped by status columns.
         Returns dict with keys: todo, in_progress, review, completed
         """
-        tasks = db.query(ProjectTask).filter(
+        # Fetch only the serialized columns — no ORM instance hydration
+        rows = db.query(
+            ProjectTask.id,
+            ProjectTask.title,
+            ProjectTask.description,
+            ProjectTask.status,
+            ProjectTask.priority,
+            ProjectTask.assignee_id,
+            ProjectTask.due_date,
+            ProjectTask.position,
+            ProjectTask.estimated_hours,
+            ProjectTask.actual_hours,
+        ).filter(
             ProjectTask.project_id == project_id
         ).order_by(ProjectTask.position).all()
 
@@ -34,23 +51,26 @@ class ProjectService:
             "completed": [],
         }
 
-        for task in tasks:
-            task_dict = {
-                "id": str(task.id),
-                "title": task.title,
-                "description": task.description,
-                "status": task.status.value if task.status else "todo",
-                "priority": task.priority.value if task.priority else "medium",
-                "assignee_id": str(task.assignee_id) if task.assignee_id else None,
-                "due_date": task.due_date,
-                "position": task.position,
-                "estimated_hours": float(task.estimated_hours) if task.estimated_hours else None,
-                "actual_hours": float(task.actual_hours) if task.actual_hours else None,
-            }
-
-            status = task.status.value if task.status else "todo"
-            if status in grouped:
-                grouped[status].append(task_dict)
+        for (
+            task_id, title, description, status, priority, assignee_id,
+            due_date, position, estimated_hours, actual_hours,
+        ) in rows:
+            status_value = status.value if status else "todo"
+            column = grouped.get(status_value)
+            if column is None:
+                continue
+            column.append({
+                "id": str(task_id),
+                "title": title,
+                "description": description,
+                "status": status_value,
+                "priority": priority.value if priority else "medium",
+                "assignee_id": str(assignee_id) if assignee_id else None,
+                "due_date": due_date,
+                "position": position,
+                "estimated_hours": float(estimated_hours) if estimated_hours else None,
+                "actual_hours": float(actual_hours) if actual_hours else None,
+            })
 
         return grouped
 
@@ -76,61 +96,60 @@ class ProjectService:
         old_position = task.position
         project_id = task.project_id
 
-        # If moving to same status, just update position
+        # Shift the affected positions with set-based UPDATEs; the moved task
+        # itself is updated below and refreshed after commit
         if old_status == new_status:
             # Reorder tasks in same status
             if new_position < old_position:
                 # Moving up - increment positions below new position
-                affected = db.query(ProjectTask).filter(
-                    and_(
+                db.execute(
+                    update(ProjectTask)
+                    .where(
                         ProjectTask.project_id == project_id,
                         ProjectTask.status == new_status,
                         ProjectTask.position >= new_position,
                         ProjectTask.position < old_position,
                     )
-                ).all()
-                for t in affected:
-                    t.position += 1
+                    .values(position=ProjectTask.position + 1)
+                    .execution_options(synchronize_session=False)
+                )
             else:
                 # Moving down - decrement positions above new position
-                affected = db.query(ProjectTask).filter(
-                    and_(
+                db.execute(
+                    update(ProjectTask)
+                    .where(
                         ProjectTask.project_id == project_id,
                         ProjectTask.status == new_status,
                         ProjectTask.position > old_position,
                         ProjectTask.position <= new_position,
                     )
-                ).all()
-                for t in affected:
-                    t.position -= 1
-        else:
-            # Moving to different status - handle both columns
-            # Remove from old position
-            db.query(ProjectTask).filter(
-                and_(
-                    ProjectTask.project_id == project_id,
-                    ProjectTask.status == old_status,
-                    ProjectTask.position > old_position,
+                    .values(position=ProjectTask.position - 1)
+                    .execution_options(synchronize_session=False)
                 )
-            ).all()
-            for t in db.query(ProjectTask).filter(
-                and_(
+        else:
+            # Moving to different status - close the gap in the old column
+            db.execute(
+                update(ProjectTask)
+                .where(
                     ProjectTask.project_id == project_id,
                     ProjectTask.status == old_status,
                     ProjectTask.position > old_position,
                 )
-            ).all():
-                t.position -= 1
+                .values(position=ProjectTask.position - 1)
+                .execution_options(synchronize_session=False)
+            )
 
             # Increment positions in new column at and after new position
-            for t in db.query(ProjectTask).filter(
-                and_(
+            db.execute(
+                update(ProjectTask)
+                .where(
                     ProjectTask.project_id == project_id,
                     ProjectTask.status == new_status,
                     ProjectTask.position >= new_position,
                 )
-            ).all():
-                t.position += 1
+                .values(position=ProjectTask.position + 1)
+                .execution_options(synchronize_session=False)
+            )
 
         # Update task
         task.status = new_status
@@ -150,36 +169,19 @@ class ProjectService:
     @staticmethod
     def get_project_stats(project_id: UUID, db: Session) -> dict:
         """Calculate project statistics"""
-        total = db.query(ProjectTask).filter(
+        rows = db.query(ProjectTask.status, func.count(ProjectTask.id)).filter(
             ProjectTask.project_id == project_id
-        ).count()
-
-        completed = db.query(ProjectTask).filter(
-            and_(
-                ProjectTask.project_id == project_id,
-                ProjectTask.status == "completed",
-            )
-        ).count()
-
-        in_progress = db.query(ProjectTask).filter(
-            and_(
-                ProjectTask.project_id == project_id,
-                ProjectTask.status == "in_progress",
-            )
-        ).count()
-
-        pending = db.query(ProjectTask).filter(
-            and_(
-                ProjectTask.project_id == project_id,
-                ProjectTask.status.in_(["todo", "review"]),
-            )
-        ).count()
+        ).group_by(ProjectTask.status).all()
+        counts = {
+            (status.value if hasattr(status, "value") else status): count
+            for status, count in rows
+        }
 
         return {
-            "total": total,
-            "completed": completed,
-            "in_progress": in_progress,
-            "pending": pending,
+            "total": sum(counts.values()),
+            "completed": counts.get("completed", 0),
+            "in_progress": counts.get("in_progress", 0),
+            "pending": counts.get("todo", 0) + counts.get("review", 0),
         }
 
     @staticmethod
@@ -208,15 +210,18 @@ class ProjectService:
         if owner_id:
             query = query.filter(Project.owner_id == owner_id)
 
-        total_count = query.count()
-
+        # Window count returns the filtered total alongside the page in one round-trip
         offset = (page - 1) * limit
-        projects = (
-            query.order_by(desc(Project.created_at))
+        rows = (
+            query.add_columns(func.count().over().label("total"))
+            .order_by(desc(Project.created_at))
             .offset(offset)
             .limit(limit)
             .all()
         )
+        projects = [row[0] for row in rows]
+        # A page past the end has no rows to carry the total
+        total_count = rows[0].total if rows else (query.count() if offset else 0)
 
         return projects, total_count
 
@@ -241,11 +246,10 @@ class ProjectService:
         if not collaborator:
             return False
 
-        role_hierarchy = ["viewer", "commenter", "editor", "owner"]
-        user_role_index = role_hierarchy.index(collaborator.role.value)
-        min_role_index = role_hierarchy.index(min_role)
-
-        return user_role_index >= min_role_index
+        try:
+            return _ROLE_RANK[collaborator.role.value] >= _ROLE_RANK[min_role]
+        except KeyError:
+            return False
 
     @staticmethod
     def add_collaborator(
@@ -255,33 +259,25 @@ class ProjectService:
         db: Session,
     ) -> dict:
         """Add or update collaborator on project"""
-        # Check if already exists
-        existing = db.query(ProjectCollaborator).filter(
-            and_(
-                ProjectCollaborator.project_id == project_id,
-                ProjectCollaborator.user_id == user_id,
+        role = CollaboratorRole(role)
+        # Single INSERT ... ON CONFLICT (project_id, user_id) DO UPDATE ... RETURNING
+        stmt = (
+            pg_insert(ProjectCollaborator)
+            .values(project_id=project_id, user_id=user_id, role=role)
+            .on_conflict_do_update(
+                index_elements=["project_id", "user_id"],
+                set_={"role": role},
             )
-        ).first()
-
-        if existing:
-            existing.role = role
-            db.commit()
-            db.refresh(existing)
-            collab = existing
-        else:
-            collab = ProjectCollaborator(
-                project_id=project_id,
-                user_id=user_id,
-                role=role,
-            )
-            db.add(collab)
-            db.commit()
-            db.refresh(collab)
-
-        return {
+            .returning(ProjectCollaborator)
+        )
+        collab = db.execute(stmt).scalar_one()
+        # Serialize before commit so expired attributes don't trigger a reload
+        result = {
             "id": str(collab.id),
             "project_id": str(collab.project_id),
             "user_id": str(collab.user_id),
             "role": collab.role.value,
             "joined_at": collab.joined_at,
         }
+        db.commit()
+        return result
@@ -3,8 +3,10 @@ from datetime import datetime, timedelta
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, insert, lambda_stmt, literal, null, select, text, update
+from sqlalchemy.orm import Session, lazyload
 
+from app.db.session import commit_returning
 from app.models.reminder import (
     Reminder,
     ReminderType,
@@ -25,6 +27,49 @@ OFFSET_DELTAS = {
     ReminderOffset.ONE_DAY_OVERDUE: timedelta(days=-1),
 }
 
+# Title/message templates for auto due-date reminders, keyed by offset
+_OFFSET_TITLES = {
+    ReminderOffset.THREE_DAYS_BEFORE: "{entity_type} due in 3 days",
+    ReminderOffset.ONE_DAY_BEFORE: "{entity_type} due tomorrow",
+    ReminderOffset.ON_DUE_DATE: "{entity_type} due today",
+    ReminderOffset.ONE_DAY_OVERDUE: "{entity_type} is overdue",
+}
+_OFFSET_MESSAGES = {
+    ReminderOffset.THREE_DAYS_BEFORE: '"{entity_name}" is due on {due_str} — 3 days from now.',
+    ReminderOffset.ONE_DAY_BEFORE: '"{entity_name}" is due tomorrow ({due_str}). Please review.',
+    ReminderOffset.ON_DUE_DATE: '"{entity_name}" is due today ({due_str}). Take action now.',
+    ReminderOffset.ONE_DAY_OVERDUE: '"{entity_name}" was due on {due_str} and is now overdue!',
+}
+
+# Database clock as naive UTC (the reminder columns are naive UTC timestamps),
+# so bulk status changes are stamped consistently across app servers
+_DB_UTC_NOW = func.timezone("utc", func.now())
+
+# Upper bound on reminders handled per scheduler tick
+REMINDER_BATCH_SIZE = 500
+
+# Postgres channel the scheduler LISTENs on to learn about new due times
+REMINDER_NOTIFY_CHANNEL = "reminder_due"
+
+
+def _notify_scheduler(db: Session) -> None:
+    """Wake the reminder scheduler once the current transaction commits.
+
+    NOTIFY is transactional: nothing is sent if the transaction rolls back.
+    """
+    db.execute(text(f"NOTIFY {REMINDER_NOTIFY_CHANNEL}"))
+
+
+def _user_reminder_stmt(reminder_id: UUID, user_id: UUID):
+    """SELECT for one reminder owned by a user.
+
+    Built as a lambda statement so SQLAlchemy caches its construction and
+    compilation; the two ids become bound parameters on each call.
+    """
+    return lambda_stmt(
+        lambda: select(Reminder).where(Reminder.id == reminder_id, Reminder.user_id == user_id)
+    )
+
 
 class ReminderService:
     """
@@ -48,9 +93,11 @@ class ReminderService:
         created_by: Optional[UUID] = None,
     ) -> Reminder:
         """Create a user-defined reminder. State is fully in DB."""
-        reminder = Reminder(
+        entity_enum = ReminderEntityType(entity_type)
+        _notify_scheduler(db)
+        return commit_returning(db, insert(Reminder).values(
             user_id=user_id,
-            entity_type=ReminderEntityType(entity_type),
+            entity_type=entity_enum,
             entity_id=entity_id,
             entity_name=entity_name,
             reminder_type=ReminderType.MANUAL,
@@ -60,11 +107,7 @@ class ReminderService:
             link=link,
             status=ReminderStatus.PENDING,
             created_by=created_by or user_id,
-        )
-        db.add(reminder)
-        db.commit()
-        db.refresh(reminder)
-        return reminder
+        ).returning(Reminder))
 
     # ─── Auto Due-Date Reminders ───
 
@@ -88,38 +131,41 @@ class ReminderService:
         Idempotent: skips if a reminder with the same entity + offset already exists.
         All state persisted in DB.
         """
-        created = []
+        entity_enum = ReminderEntityType(entity_type)
         link = f"/dashboard/assignments/{assignment_id}" if assignment_id else None
+        now = datetime.utcnow()
 
-        for offset_label, delta in OFFSET_DELTAS.items():
-            remind_at = due_date - delta  # subtract: positive delta = before due
-
-            # Skip past reminders only if they were already sent
-            # (allows generating reminders for items whose due date is approaching)
-
-            # Idempotency: check if this exact reminder already exists
-            existing = db.query(Reminder).filter(
-                Reminder.entity_type == ReminderEntityType(entity_type),
+        # Idempotency: load every existing auto reminder for this entity at once
+        existing_by_offset = {
+            r.offset_label: r
+            for r in db.query(Reminder).filter(
+                Reminder.entity_type == entity_enum,
                 Reminder.entity_id == entity_id,
-                Reminder.offset_label == offset_label,
                 Reminder.reminder_type == ReminderType.AUTO_DUE_DATE,
-            ).first()
+            ).all()
+        }
 
+        created = []
+        rescheduled = False
+        for offset_label, delta in OFFSET_DELTAS.items():
+            remind_at = due_date - delta  # subtract: positive delta = before due
+
+            existing = existing_by_offset.get(offset_label)
             if existing:
                 # If due date changed, update the remind_at time
                 if existing.remind_at != remind_at:
+                    rescheduled = True
                     existing.remind_at = remind_at
-                    existing.updated_at = datetime.utcnow()
+                    existing.updated_at = now
                     # If it was already sent but the new time is in the future, reset to pending
-                    if existing.status == ReminderStatus.SENT and remind_at > datetime.utcnow():
+                    if existing.status == ReminderStatus.SENT and remind_at > now:
                         existing.status = ReminderStatus.PENDING
                         existing.sent_at = None
-                    db.flush()
                 continue
 
-            reminder = Reminder(
+            created.append(Reminder(
                 user_id=assigned_to,
-                entity_type=ReminderEntityType(entity_type),
+                entity_type=entity_enum,
                 entity_id=entity_id,
                 entity_name=entity_name,
                 reminder_type=ReminderType.AUTO_DUE_DATE,
@@ -129,10 +175,11 @@ class ReminderService:
                 remind_at=remind_at,
                 link=link,
                 status=ReminderStatus.PENDING,
-            )
-            db.add(reminder)
-            created.append(reminder)
+            ))
 
+        db.add_all(created)
+        if created or rescheduled:
+            _notify_scheduler(db)
         db.commit()
         return created
 
@@ -141,14 +188,18 @@ class ReminderService:
         db: Session, entity_type: str, entity_id: UUID
     ) -> int:
         """Remove all auto due-date reminders when due date is cleared or entity is completed."""
+        entity_enum = ReminderEntityType(entity_type)
+        # No identity-map sync: Reminder instances already loaded in this
+        # session keep their old status until the commit below expires them,
+        # so callers must not rely on them in between
         count = db.query(Reminder).filter(
-            Reminder.entity_type == ReminderEntityType(entity_type),
+            Reminder.entity_type == entity_enum,
             Reminder.entity_id == entity_id,
             Reminder.reminder_type == ReminderType.AUTO_DUE_DATE,
             Reminder.status == ReminderStatus.PENDING,
         ).update(
-            {"status": ReminderStatus.DISMISSED, "dismissed_at": datetime.utcnow()},
-            synchronize_session="fetch",
+            {"status": ReminderStatus.DISMISSED, "dismissed_at": _DB_UTC_NOW},
+            synchronize_session=False,
         )
         db.commit()
         return count
@@ -158,39 +209,64 @@ class ReminderService:
     @staticmethod
     def process_pending_reminders(db: Session) -> int:
         """
-        Find all pending reminders whose remind_at has passed, send notifications,
-        and mark them as sent. ALL state is in DB — restart-safe.
+        Find pending reminders whose remind_at has passed (oldest first, at most
+        REMINDER_BATCH_SIZE per call), send notifications, and mark them as sent.
+        ALL state is in DB — restart-safe, and safe to run from several workers.
+        A return value of REMINDER_BATCH_SIZE means more reminders may be due.
         """
-        now = datetime.utcnow()
-        pending = db.query(Reminder).filter(
-            Reminder.status == ReminderStatus.PENDING,
-            Reminder.remind_at <= now,
-        ).all()
-
-        sent_count = 0
-        for reminder in pending:
-            try:
-                # Create in-app notification via existing notification service
-                NotificationService.create_notification(
-                    db=db,
-                    user_id=reminder.user_id,
-                    notification_type=NotificationType.GENERAL,
-                    title=reminder.title,
-                    message=reminder.message,
-                    link=reminder.link,
-                )
-
-                # Mark as sent in DB — this is the guard against duplicates
-                reminder.status = ReminderStatus.SENT
-                reminder.sent_at = now
-                reminder.updated_at = now
-                sent_count += 1
-            except Exception as e:
-                logger.error(f"Failed to process reminder {reminder.id}: {e}")
+        pending = (
+            db.query(Reminder.id, Reminder.user_id, Reminder.title, Reminder.message, Reminder.link)
+            .filter(
+                Reminder.status == ReminderStatus.PENDING,
+                Reminder.remind_at <= _DB_UTC_NOW,
+            )
+            .order_by(Reminder.remind_at)
+            .limit(REMINDER_BATCH_SIZE)
+            # Rows claimed by another scheduler instance are skipped, and the
+            # lock is held until commit, so no reminder is sent twice
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not pending:
+            return 0
+
+        # Create in-app notifications via existing notification service. Each
+        # reminder row is its own duplicate guard (claimed above, marked SENT
+        # below in the same transaction), so the time-window dedup is skipped:
+        # a reminder is never marked SENT without its notification.
+        NotificationService.create_notifications_bulk(
+            db,
+            [
+                {
+                    "user_id": reminder.user_id,
+                    "type": NotificationType.GENERAL,
+                    "title": reminder.title,
+                    "message": reminder.message,
+                    "link": reminder.link,
+                }
+                for reminder in pending
+            ],
+            dedup=False,
+        )
 
+        # Mark as sent in the same transaction — this is the guard against duplicates
+        db.query(Reminder).filter(
+            Reminder.id.in_([reminder.id for reminder in pending])
+        ).update(
+            {"status": ReminderStatus.SENT, "sent_at": _DB_UTC_NOW, "updated_at": _DB_UTC_NOW},
+            synchronize_session=False,
+        )
         db.commit()
-        logger.info(f"Processed {sent_count}/{len(pending)} pending reminders")
-        return sent_count
+        logger.info(f"Processed {len(pending)} pending reminders")
+        return len(pending)
+
+    @staticmethod
+    def seconds_until_next_due(db: Session) -> Optional[float]:
+        """Seconds until the earliest pending reminder fires (<= 0 if already due), or None."""
+        seconds = db.query(
+            func.extract("epoch", func.min(Reminder.remind_at) - _DB_UTC_NOW)
+        ).filter(Reminder.status == ReminderStatus.PENDING).scalar()
+        return float(seconds) if seconds is not None else None
 
     # ─── Snooze / Dismiss ───
 
@@ -199,41 +275,33 @@ class ReminderService:
         db: Session, reminder_id: UUID, user_id: UUID, snooze_until: datetime
     ) -> Optional[Reminder]:
         """Snooze a reminder — sets new remind_at, resets to pending. All in DB."""
-        reminder = db.query(Reminder).filter(
+        _notify_scheduler(db)
+        return commit_returning(db, update(Reminder).where(
             Reminder.id == reminder_id,
             Reminder.user_id == user_id,
-        ).first()
-        if not reminder:
-            return None
-
-        reminder.status = ReminderStatus.PENDING
-        reminder.remind_at = snooze_until
-        reminder.snoozed_until = snooze_until
-        reminder.sent_at = None
-        reminder.snooze_count += 1
-        reminder.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(reminder)
-        return reminder
+        ).values(
+            status=ReminderStatus.PENDING,
+            remind_at=snooze_until,
+            snoozed_until=snooze_until,
+            sent_at=None,
+            snooze_count=Reminder.snooze_count + 1,
+            updated_at=datetime.utcnow(),
+        ).returning(Reminder))
 
     @staticmethod
     def dismiss_reminder(
         db: Session, reminder_id: UUID, user_id: UUID
     ) -> Optional[Reminder]:
         """Dismiss a reminder so it never fires again."""
-        reminder = db.query(Reminder).filter(
+        now = datetime.utcnow()
+        return commit_returning(db, update(Reminder).where(
             Reminder.id == reminder_id,
             Reminder.user_id == user_id,
-        ).first()
-        if not reminder:
-            return None
-
-        reminder.status = ReminderStatus.DISMISSED
-        reminder.dismissed_at = datetime.utcnow()
-        reminder.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(reminder)
-        return reminder
+        ).values(
+            status=ReminderStatus.DISMISSED,
+            dismissed_at=now,
+            updated_at=now,
+        ).returning(Reminder))
 
     # ─── Query ───
 
@@ -246,7 +314,12 @@ class ReminderService:
         limit: int = 50,
     ) -> list[Reminder]:
         """Get reminders for a user, optionally filtered by status."""
-        query = db.query(Reminder).filter(Reminder.user_id == user_id)
+        # ReminderResponse never reads .user, so skip the default joined load
+        # (which also gets in the way of the (user_id, remind_at) index
+        # serving ORDER BY ... LIMIT)
+        query = db.query(Reminder).options(lazyload(Reminder.user)).filter(
+            Reminder.user_id == user_id
+        )
         if status_filter:
             query = query.filter(Reminder.status == ReminderStatus(status_filter))
         return query.order_by(Reminder.remind_at.asc()).offset(skip).limit(limit).all()
@@ -255,29 +328,18 @@ class ReminderService:
     def get_reminder_by_id(
         db: Session, reminder_id: UUID, user_id: UUID
     ) -> Optional[Reminder]:
-        return db.query(Reminder).filter(
-            Reminder.id == reminder_id,
-            Reminder.user_id == user_id,
-        ).first()
+        return db.execute(_user_reminder_stmt(reminder_id, user_id)).scalar_one_or_none()
 
     @staticmethod
     def get_reminder_counts(db: Session, user_id: UUID) -> dict:
         """Get counts of pending and overdue reminders for a user."""
         now = datetime.utcnow()
-        pending = db.query(Reminder).filter(
-            Reminder.user_id == user_id,
-            Reminder.status == ReminderStatus.PENDING,
-        ).count()
-
-        overdue = db.query(Reminder).filter(
-            Reminder.user_id == user_id,
-            Reminder.status == ReminderStatus.PENDING,
-            Reminder.remind_at <= now,
-        ).count()
-
-        total = db.query(Reminder).filter(
-            Reminder.user_id == user_id,
-        ).count()
+        is_pending = Reminder.status == ReminderStatus.PENDING
+        total, pending, overdue = db.query(
+            func.count(),
+            func.count().filter(is_pending),
+            func.count().filter(is_pending, Reminder.remind_at <= now),
+        ).filter(Reminder.user_id == user_id).one()
 
         return {"pending": pending, "overdue": overdue, "total": total}
 
@@ -289,39 +351,42 @@ class ReminderService:
         data: dict,
     ) -> Optional[Reminder]:
         """Update a manual reminder's title, message, or remind_at."""
-        reminder = db.query(Reminder).filter(
+        now = datetime.utcnow()
+        values = {
+            key: data[key]
+            for key in ("title", "message", "remind_at")
+            if key in data and data[key] is not None
+        }
+        # If remind_at moved into the future and the reminder was already sent,
+        # reset it to pending (decided in the UPDATE from the row's current status)
+        if "remind_at" in values and values["remind_at"] > now:
+            was_sent = Reminder.status == ReminderStatus.SENT
+            values["status"] = case(
+                (was_sent, literal(ReminderStatus.PENDING, Reminder.status.type)),
+                else_=Reminder.status,
+            )
+            values["sent_at"] = case((was_sent, null()), else_=Reminder.sent_at)
+        values["updated_at"] = now
+        if "remind_at" in values:
+            _notify_scheduler(db)
+
+        return commit_returning(db, update(Reminder).where(
             Reminder.id == reminder_id,
             Reminder.user_id == user_id,
-        ).first()
-        if not reminder:
-            return None
-
-        for key in ("title", "message", "remind_at"):
-            if key in data and data[key] is not None:
-                setattr(reminder, key, data[key])
-                # If remind_at changed and reminder was already sent, reset to pending
-                if key == "remind_at" and reminder.status == ReminderStatus.SENT:
-                    if data[key] > datetime.utcnow():
-                        reminder.status = ReminderStatus.PENDING
-                        reminder.sent_at = None
-
-        reminder.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(reminder)
-        return reminder
+        ).values(**values).returning(Reminder))
 
     @staticmethod
     def delete_reminder(
         db: Session, reminder_id: UUID, user_id: UUID
     ) -> bool:
         """Delete a reminder (hard delete)."""
-        reminder = db.query(Reminder).filter(
-            Reminder.id == reminder_id,
-            Reminder.user_id == user_id,
-        ).first()
-        if not reminder:
+        deleted = db.execute(lambda_stmt(
+            lambda: delete(Reminder)
+            .where(Reminder.id == reminder_id, Reminder.user_id == user_id)
+            .returning(Reminder.id)
+        )).first()
+        if not deleted:
             return False
-        db.delete(reminder)
         db.commit()
         return True
 
@@ -329,13 +394,10 @@ class ReminderService:
 
     @staticmethod
     def _offset_title(offset: ReminderOffset, entity_type: str, entity_name: str) -> str:
-        labels = {
-            ReminderOffset.THREE_DAYS_BEFORE: f"{entity_type.title()} due in 3 days",
-            ReminderOffset.ONE_DAY_BEFORE: f"{entity_type.title()} due tomorrow",
-            ReminderOffset.ON_DUE_DATE: f"{entity_type.title()} due today",
-            ReminderOffset.ONE_DAY_OVERDUE: f"{entity_type.title()} is overdue",
-        }
-        return labels.get(offset, f"Reminder: {entity_name}")
+        template = _OFFSET_TITLES.get(offset)
+        if template is None:
+            return f"Reminder: {entity_name}"
+        return template.format(entity_type=entity_type.title())
 
     @staticmethod
     def _offset_message(
@@ -344,19 +406,7 @@ class ReminderService:
         entity_name: str,
         due_date: datetime,
     ) -> str:
-        due_str = due_date.strftime("%b %d, %Y")
-        messages = {
-            ReminderOffset.THREE_DAYS_BEFORE: (
-                f'"{entity_name}" is due on {due_str} — 3 days from now.'
-            ),
-            ReminderOffset.ONE_DAY_BEFORE: (
-                f'"{entity_name}" is due tomorrow ({due_str}). Please review.'
-            ),
-            ReminderOffset.ON_DUE_DATE: (
-                f'"{entity_name}" is due today ({due_str}). Take action now.'
-            ),
-            ReminderOffset.ONE_DAY_OVERDUE: (
-                f'"{entity_name}" was due on {due_str} and is now overdue!'
-            ),
-        }
-        return messages.get(offset, f'Reminder for "{entity_name}"')
+        template = _OFFSET_MESSAGES.get(offset)
+        if template is None:
+            return f'Reminder for "{entity_name}"'
+        return template.format(entity_name=entity_name, due_str=due_date.strftime("%b %d, %Y"))
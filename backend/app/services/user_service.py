@@ -1,16 +1,26 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.models.user import User, UserRole
 from app.schemas.user import UserOnboard
 from app.core.security import get_password_hash
 
+PASSWORD_HASH_WORKERS = min(8, os.cpu_count() or 1)
+
 def onboard_multiple_users(db: Session, user_list: list[UserOnboard]):
-    created_emails = []
     errors = []
 
+    # Check which emails are already taken in one query
+    requested_emails = [user_data.email for user_data in user_list]
+    existing_emails = {
+        email for (email,) in db.query(User.email).filter(User.email.in_(requested_emails)).all()
+    }
+
+    pending = []
     for user_data in user_list:
-        # Check if email is already taken
-        user_exists = db.query(User).filter(User.email == user_data.email).first()
-        if user_exists:
+        if user_data.email in existing_emails:
             errors.append({"email": user_data.email, "detail": "User already exists"})
             continue
 
@@ -23,20 +33,45 @@ def onboard_multiple_users(db: Session, user_list: list[UserOnboard]):
             first_name = "First"
             last_name = "Last"
 
-        # Create the new user object
-        hashed_password = get_password_hash(user_data.password or "Welcome123!")
+        pending.append((user_data, first_name, last_name))
+        existing_emails.add(user_data.email)
 
-        new_user = User(
-            first_name=first_name,
-            last_name=last_name,
-            email=user_data.email,
-            role=UserRole.ENDUSER,  # default role for onboarding
-            hashed_password=hashed_password,
-            is_active=True
-        )
+    # bcrypt dominates the cost per user and releases the GIL while hashing,
+    # so spread it over a thread pool
+    with ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS) as executor:
+        hashed_passwords = list(executor.map(
+            get_password_hash,
+            [user_data.password or "Welcome123!" for user_data, _, _ in pending],
+        ))
+
+    rows = [
+        {
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": user_data.email,
+            "role": UserRole.ENDUSER,  # default role for onboarding
+            "hashed_password": hashed_password,
+            "is_active": True,
+        }
+        for (user_data, first_name, last_name), hashed_password in zip(pending, hashed_passwords)
+    ]
 
-        db.add(new_user)
-        created_emails.append(user_data.email)
+    # Single multi-row insert; ON CONFLICT skips users created concurrently
+    # since the existence check
+    created_emails = []
+    if rows:
+        created_emails = db.execute(
+            pg_insert(User)
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(User.email),
+            rows,
+        ).scalars().all()
+        created = set(created_emails)
+        errors.extend(
+            {"email": row["email"], "detail": "User already exists"}
+            for row in rows
+            if row["email"] not in created
+        )
 
     db.commit()
     return {
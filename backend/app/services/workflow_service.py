@@ -1,12 +1,17 @@
 """
 Workflow Template Business Logic Service
 """
+import threading
+from collections import defaultdict
 from datetime import datetime
+from cachetools import TTLCache
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Integer, column, func, insert, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from uuid import UUID, uuid4
 from typing import Optional, List
 
+from app.db.session import commit_returning
 from app.models.workflow import (
     Workflow,
     WorkflowStatus,
@@ -16,6 +21,37 @@ from app.models.workflow import (
 )
 from app.models.agent import WorkflowTaskAgent, Agent
 
+# Rendered hierarchies keyed by (workflow_id, workflow.updated_at). Every
+# template change bumps the workflow's updated_at, so stale entries are never
+# hit, even from other workers; the TTL bounds agent name/type drift, which
+# does not touch the workflow
+_HIERARCHY_CACHE: TTLCache = TTLCache(maxsize=256, ttl=300)
+# Sync endpoints run on a thread pool and TTLCache is not thread-safe
+_HIERARCHY_CACHE_LOCK = threading.Lock()
+
+
+def _stage_workflow_id(stage_id: UUID):
+    return select(WorkflowStage.workflow_id).where(WorkflowStage.id == stage_id).scalar_subquery()
+
+
+def _step_workflow_id(step_id: UUID):
+    return (
+        select(WorkflowStage.workflow_id)
+        .join(WorkflowStep, WorkflowStep.stage_id == WorkflowStage.id)
+        .where(WorkflowStep.id == step_id)
+        .scalar_subquery()
+    )
+
+
+def _task_workflow_id(task_id: UUID):
+    return (
+        select(WorkflowStage.workflow_id)
+        .join(WorkflowStep, WorkflowStep.stage_id == WorkflowStage.id)
+        .join(WorkflowTask, WorkflowTask.step_id == WorkflowStep.id)
+        .where(WorkflowTask.id == task_id)
+        .scalar_subquery()
+    )
+
 
 class WorkflowService:
     """Service for managing workflow templates and their hierarchy."""
@@ -31,17 +67,13 @@ class WorkflowService:
         db: Session = None,
     ) -> Workflow:
         org_id = organization_id or uuid4()
-        workflow = Workflow(
+        return commit_returning(db, insert(Workflow).values(
             name=name,
             description=description,
             organization_id=org_id,
             created_by=created_by,
             status=WorkflowStatus.DRAFT,
-        )
-        db.add(workflow)
-        db.commit()
-        db.refresh(workflow)
-        return workflow
+        ).returning(Workflow))
 
     @staticmethod
     def get_workflow(workflow_id: UUID, db: Session) -> Optional[Workflow]:
@@ -51,11 +83,13 @@ class WorkflowService:
     def list_workflows(
         db: Session,
         status: Optional[str] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
     ) -> List[Workflow]:
         query = db.query(Workflow)
         if status:
             query = query.filter(Workflow.status == status)
-        return query.order_by(Workflow.name).all()
+        return query.order_by(Workflow.name, Workflow.id).offset(skip).limit(limit).all()
 
     @staticmethod
     def update_workflow(
@@ -65,49 +99,74 @@ class WorkflowService:
         description: Optional[str] = None,
         status: Optional[str] = None,
     ) -> Optional[Workflow]:
-        workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
-        if not workflow:
-            return None
+        values = {}
         if name is not None:
-            workflow.name = name
+            values["name"] = name
         if description is not None:
-            workflow.description = description
+            values["description"] = description
         if status is not None:
-            workflow.status = WorkflowStatus(status)
-        workflow.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(workflow)
-        return workflow
+            values["status"] = WorkflowStatus(status)
+        values["updated_at"] = datetime.utcnow()
+        return commit_returning(
+            db,
+            update(Workflow).where(Workflow.id == workflow_id).values(**values).returning(Workflow),
+        )
 
     @staticmethod
     def delete_workflow(workflow_id: UUID, db: Session) -> bool:
-        workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
-        if not workflow:
+        deleted = db.query(Workflow).filter(Workflow.id == workflow_id).delete(
+            synchronize_session=False
+        )
+        if not deleted:
             return False
-        # Delete all children first (tasks → steps → stages)
-        stages = db.query(WorkflowStage).filter(
-            WorkflowStage.workflow_id == workflow_id
-        ).all()
-        for stage in stages:
-            steps = db.query(WorkflowStep).filter(
-                WorkflowStep.stage_id == stage.id
-            ).all()
-            for step in steps:
-                tasks = db.query(WorkflowTask).filter(
-                    WorkflowTask.step_id == step.id
-                ).all()
-                for task in tasks:
-                    # Remove agents attached to template task
-                    db.query(WorkflowTaskAgent).filter(
-                        WorkflowTaskAgent.task_id == task.id
-                    ).delete()
-                    db.delete(task)
-                db.delete(step)
-            db.delete(stage)
-        db.delete(workflow)
+        # Children are not FK-linked, so remove them with set-based deletes
+        stage_ids = select(WorkflowStage.id).where(WorkflowStage.workflow_id == workflow_id)
+        WorkflowService._delete_stage_children(stage_ids, db)
+        db.query(WorkflowStage).filter(WorkflowStage.workflow_id == workflow_id).delete(
+            synchronize_session=False
+        )
         db.commit()
         return True
 
+    @staticmethod
+    def _delete_stage_children(stage_ids, db: Session) -> None:
+        """Bulk-delete the steps, tasks and task agents under the given stage ids select."""
+        step_ids = select(WorkflowStep.id).where(WorkflowStep.stage_id.in_(stage_ids))
+        WorkflowService._delete_step_children(step_ids, db)
+        db.query(WorkflowStep).filter(WorkflowStep.stage_id.in_(stage_ids)).delete(
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def _delete_step_children(step_ids, db: Session) -> None:
+        """Bulk-delete the tasks and task agents under the given step ids select."""
+        task_ids = select(WorkflowTask.id).where(WorkflowTask.step_id.in_(step_ids))
+        db.query(WorkflowTaskAgent).filter(WorkflowTaskAgent.task_id.in_(task_ids)).delete(
+            synchronize_session=False
+        )
+        db.query(WorkflowTask).filter(WorkflowTask.step_id.in_(step_ids)).delete(
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def touch_workflow(db: Session, workflow_id) -> None:
+        """Bump a workflow's updated_at so hierarchies cached for it go stale.
+
+        workflow_id may be a UUID or a scalar subquery resolving to one.
+        Runs in the caller's transaction; committing is left to the caller.
+        """
+        db.execute(
+            update(Workflow)
+            .where(Workflow.id == workflow_id)
+            .values(updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def touch_task_workflow(db: Session, task_id: UUID) -> None:
+        """Bump updated_at on the workflow that owns a template task."""
+        WorkflowService.touch_workflow(db, _task_workflow_id(task_id))
+
     # ── Stage CRUD ──────────────────────────────────────────────────
 
     @staticmethod
@@ -124,24 +183,25 @@ class WorkflowService:
                 WorkflowStage.workflow_id == workflow_id
             ).scalar()
             position = (max_pos or 0) + 1
-        stage = WorkflowStage(
+        WorkflowService.touch_workflow(db, workflow_id)
+        return commit_returning(db, insert(WorkflowStage).values(
             workflow_id=workflow_id,
             name=name,
             description=description,
             position=position,
             execution_mode=execution_mode or "sequential",
-        )
-        db.add(stage)
-        db.commit()
-        db.refresh(stage)
-        return stage
+        ).returning(WorkflowStage))
 
     @staticmethod
-    def list_stages(workflow_id: UUID, db: Session) -> List[WorkflowStage]:
+    def list_stages(
+        workflow_id: UUID, db: Session, skip: int = 0, limit: Optional[int] = None
+    ) -> List[WorkflowStage]:
         return (
             db.query(WorkflowStage)
             .filter(WorkflowStage.workflow_id == workflow_id)
-            .order_by(WorkflowStage.position)
+            .order_by(WorkflowStage.position, WorkflowStage.id)
+            .offset(skip)
+            .limit(limit)
             .all()
         )
 
@@ -154,50 +214,55 @@ class WorkflowService:
         position: Optional[int] = None,
         execution_mode: Optional[str] = None,
     ) -> Optional[WorkflowStage]:
-        stage = db.query(WorkflowStage).filter(WorkflowStage.id == stage_id).first()
-        if not stage:
-            return None
+        values = {}
         if name is not None:
-            stage.name = name
+            values["name"] = name
         if description is not None:
-            stage.description = description
+            values["description"] = description
         if position is not None:
-            stage.position = position
+            values["position"] = position
         if execution_mode is not None:
-            stage.execution_mode = execution_mode
-        stage.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(stage)
-        return stage
+            values["execution_mode"] = execution_mode
+        values["updated_at"] = datetime.utcnow()
+        WorkflowService.touch_workflow(db, _stage_workflow_id(stage_id))
+        return commit_returning(
+            db,
+            update(WorkflowStage).where(WorkflowStage.id == stage_id).values(**values).returning(WorkflowStage),
+        )
 
     @staticmethod
     def delete_stage(stage_id: UUID, db: Session) -> bool:
-        stage = db.query(WorkflowStage).filter(WorkflowStage.id == stage_id).first()
-        if not stage:
+        WorkflowService.touch_workflow(db, _stage_workflow_id(stage_id))
+        deleted = db.query(WorkflowStage).filter(WorkflowStage.id == stage_id).delete(
+            synchronize_session=False
+        )
+        if not deleted:
             return False
-        # Delete children
-        steps = db.query(WorkflowStep).filter(WorkflowStep.stage_id == stage_id).all()
-        for step in steps:
-            tasks = db.query(WorkflowTask).filter(WorkflowTask.step_id == step.id).all()
-            for task in tasks:
-                db.query(WorkflowTaskAgent).filter(
-                    WorkflowTaskAgent.task_id == task.id
-                ).delete()
-                db.delete(task)
-            db.delete(step)
-        db.delete(stage)
+        WorkflowService._delete_stage_children([stage_id], db)
         db.commit()
         return True
 
     @staticmethod
     def reorder_stages(workflow_id: UUID, stage_ids: List[UUID], db: Session) -> bool:
-        stages = db.query(WorkflowStage).filter(
-            WorkflowStage.workflow_id == workflow_id
-        ).all()
-        stage_map = {s.id: s for s in stages}
-        for idx, sid in enumerate(stage_ids):
-            if sid in stage_map:
-                stage_map[sid].position = idx + 1
+        if not stage_ids:
+            return True
+        # One UPDATE ... FROM (VALUES ...) instead of an UPDATE per stage;
+        # ids not belonging to this workflow are ignored
+        new_positions = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("position", Integer),
+            name="new_positions",
+        ).data([(sid, idx + 1) for idx, sid in enumerate(stage_ids)])
+        db.execute(
+            update(WorkflowStage)
+            .where(
+                WorkflowStage.workflow_id == workflow_id,
+                WorkflowStage.id == new_positions.c.id,
+            )
+            .values(position=new_positions.c.position)
+            .execution_options(synchronize_session=False)
+        )
+        WorkflowService.touch_workflow(db, workflow_id)
         db.commit()
         return True
 
@@ -217,24 +282,25 @@ class WorkflowService:
                 WorkflowStep.stage_id == stage_id
             ).scalar()
             position = (max_pos or 0) + 1
-        step = WorkflowStep(
+        WorkflowService.touch_workflow(db, _stage_workflow_id(stage_id))
+        return commit_returning(db, insert(WorkflowStep).values(
             stage_id=stage_id,
             name=name,
             description=description,
             position=position,
             execution_mode=execution_mode or "sequential",
-        )
-        db.add(step)
-        db.commit()
-        db.refresh(step)
-        return step
+        ).returning(WorkflowStep))
 
     @staticmethod
-    def list_steps(stage_id: UUID, db: Session) -> List[WorkflowStep]:
+    def list_steps(
+        stage_id: UUID, db: Session, skip: int = 0, limit: Optional[int] = None
+    ) -> List[WorkflowStep]:
         return (
             db.query(WorkflowStep)
             .filter(WorkflowStep.stage_id == stage_id)
-            .order_by(WorkflowStep.position)
+            .order_by(WorkflowStep.position, WorkflowStep.id)
+            .offset(skip)
+            .limit(limit)
             .all()
         )
 
@@ -247,34 +313,31 @@ class WorkflowService:
         position: Optional[int] = None,
         execution_mode: Optional[str] = None,
     ) -> Optional[WorkflowStep]:
-        step = db.query(WorkflowStep).filter(WorkflowStep.id == step_id).first()
-        if not step:
-            return None
+        values = {}
         if name is not None:
-            step.name = name
+            values["name"] = name
         if description is not None:
-            step.description = description
+            values["description"] = description
         if position is not None:
-            step.position = position
+            values["position"] = position
         if execution_mode is not None:
-            step.execution_mode = execution_mode
-        step.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(step)
-        return step
+            values["execution_mode"] = execution_mode
+        values["updated_at"] = datetime.utcnow()
+        WorkflowService.touch_workflow(db, _step_workflow_id(step_id))
+        return commit_returning(
+            db,
+            update(WorkflowStep).where(WorkflowStep.id == step_id).values(**values).returning(WorkflowStep),
+        )
 
     @staticmethod
     def delete_step(step_id: UUID, db: Session) -> bool:
-        step = db.query(WorkflowStep).filter(WorkflowStep.id == step_id).first()
-        if not step:
+        WorkflowService.touch_workflow(db, _step_workflow_id(step_id))
+        deleted = db.query(WorkflowStep).filter(WorkflowStep.id == step_id).delete(
+            synchronize_session=False
+        )
+        if not deleted:
             return False
-        tasks = db.query(WorkflowTask).filter(WorkflowTask.step_id == step_id).all()
-        for task in tasks:
-            db.query(WorkflowTaskAgent).filter(
-                WorkflowTaskAgent.task_id == task.id
-            ).delete()
-            db.delete(task)
-        db.delete(step)
+        WorkflowService._delete_step_children([step_id], db)
         db.commit()
         return True
 
@@ -293,23 +356,24 @@ class WorkflowService:
                 WorkflowTask.step_id == step_id
             ).scalar()
             position = (max_pos or 0) + 1
-        task = WorkflowTask(
+        WorkflowService.touch_workflow(db, _step_workflow_id(step_id))
+        return commit_returning(db, insert(WorkflowTask).values(
             step_id=step_id,
             name=name,
             description=description,
             position=position,
-        )
-        db.add(task)
-        db.commit()
-        db.refresh(task)
-        return task
+        ).returning(WorkflowTask))
 
     @staticmethod
-    def list_tasks(step_id: UUID, db: Session) -> List[WorkflowTask]:
+    def list_tasks(
+        step_id: UUID, db: Session, skip: int = 0, limit: Optional[int] = None
+    ) -> List[WorkflowTask]:
         return (
             db.query(WorkflowTask)
             .filter(WorkflowTask.step_id == step_id)
-            .order_by(WorkflowTask.position)
+            .order_by(WorkflowTask.position, WorkflowTask.id)
+            .offset(skip)
+            .limit(limit)
             .all()
         )
 
@@ -321,25 +385,26 @@ class WorkflowService:
         description: Optional[str] = None,
         position: Optional[int] = None,
     ) -> Optional[WorkflowTask]:
-        task = db.query(WorkflowTask).filter(WorkflowTask.id == task_id).first()
-        if not task:
-            return None
+        values = {}
         if name is not None:
-            task.name = name
+            values["name"] = name
         if description is not None:
-            task.description = description
+            values["description"] = description
         if position is not None:
-            task.position = position
-        task.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(task)
-        return task
+            values["position"] = position
+        values["updated_at"] = datetime.utcnow()
+        WorkflowService.touch_workflow(db, _task_workflow_id(task_id))
+        return commit_returning(
+            db,
+            update(WorkflowTask).where(WorkflowTask.id == task_id).values(**values).returning(WorkflowTask),
+        )
 
     @staticmethod
     def delete_task(task_id: UUID, db: Session) -> bool:
         task = db.query(WorkflowTask).filter(WorkflowTask.id == task_id).first()
         if not task:
             return False
+        WorkflowService.touch_workflow(db, _task_workflow_id(task_id))
         db.query(WorkflowTaskAgent).filter(
             WorkflowTaskAgent.task_id == task_id
         ).delete()
@@ -355,6 +420,12 @@ class WorkflowService:
         if not workflow:
             return None
 
+        cache_key = (workflow.id, workflow.updated_at)
+        with _HIERARCHY_CACHE_LOCK:
+            cached = _HIERARCHY_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
         stages = (
             db.query(WorkflowStage)
             .filter(WorkflowStage.workflow_id == workflow_id)
@@ -362,80 +433,86 @@ class WorkflowService:
             .all()
         )
 
-        stages_data = []
-        for stage in stages:
-            steps = (
-                db.query(WorkflowStep)
-                .filter(WorkflowStep.stage_id == stage.id)
-                .order_by(WorkflowStep.position)
-                .all()
-            )
+        # Load each level with one IN (...) query and stitch the tree in memory
+        stage_ids = [stage.id for stage in stages]
+        steps = (
+            db.query(WorkflowStep)
+            .filter(WorkflowStep.stage_id.in_(stage_ids))
+            .order_by(WorkflowStep.position)
+            .all()
+        ) if stage_ids else []
+        step_ids = [step.id for step in steps]
+        tasks = (
+            db.query(WorkflowTask)
+            .filter(WorkflowTask.step_id.in_(step_ids))
+            .order_by(WorkflowTask.position)
+            .all()
+        ) if step_ids else []
+        task_ids = [task.id for task in tasks]
+        task_agents = (
+            db.query(WorkflowTaskAgent, Agent.name, Agent.agent_type)
+            .outerjoin(Agent, Agent.id == WorkflowTaskAgent.agent_id)
+            .filter(WorkflowTaskAgent.task_id.in_(task_ids))
+            .order_by(WorkflowTaskAgent.position)
+            .all()
+        ) if task_ids else []
+
+        agents_by_task = defaultdict(list)
+        for ta, agent_name, agent_type in task_agents:
+            agents_by_task[ta.task_id].append({
+                "id": str(ta.id),
+                "agent_id": str(ta.agent_id),
+                "agent_name": agent_name if agent_name is not None else "Unknown",
+                "agent_type": agent_type.value if agent_type is not None else "custom",
+                "is_required": ta.is_required,
+                "position": ta.position,
+                "instructions": ta.instructions,
+            })
+
+        tasks_by_step = defaultdict(list)
+        for task in tasks:
+            tasks_by_step[task.step_id].append({
+                "id": str(task.id),
+                "name": task.name,
+                "description": task.description,
+                "position": task.position,
+                "agents": agents_by_task[task.id],
+            })
 
-            steps_data = []
-            for step in steps:
-                tasks = (
-                    db.query(WorkflowTask)
-                    .filter(WorkflowTask.step_id == step.id)
-                    .order_by(WorkflowTask.position)
-                    .all()
-                )
-
-                tasks_data = []
-                for task in tasks:
-                    # Get agents attached to this template task
-                    task_agents = (
-                        db.query(WorkflowTaskAgent)
-                        .filter(WorkflowTaskAgent.task_id == task.id)
-                        .order_by(WorkflowTaskAgent.position)
-                        .all()
-                    )
-                    agents_list = []
-                    for ta in task_agents:
-                        agent = db.query(Agent).filter(Agent.id == ta.agent_id).first()
-                        agents_list.append({
-                            "id": str(ta.id),
-                            "agent_id": str(ta.agent_id),
-                            "agent_name": agent.name if agent else "Unknown",
-                            "agent_type": agent.agent_type.value if agent else "custom",
-                            "is_required": ta.is_required,
-                            "position": ta.position,
-                            "instructions": ta.instructions,
-                        })
-
-                    tasks_data.append({
-                        "id": str(task.id),
-                        "name": task.name,
-                        "description": task.description,
-                        "position": task.position,
-                        "agents": agents_list,
-                    })
-
-                steps_data.append({
-                    "id": str(step.id),
-                    "name": step.name,
-                    "description": step.description,
-                    "position": step.position,
-                    "execution_mode": step.execution_mode or "sequential",
-                    "tasks": tasks_data,
-                })
-
-            stages_data.append({
+        steps_by_stage = defaultdict(list)
+        for step in steps:
+            steps_by_stage[step.stage_id].append({
+                "id": str(step.id),
+                "name": step.name,
+                "description": step.description,
+                "position": step.position,
+                "execution_mode": step.execution_mode or "sequential",
+                "tasks": tasks_by_step[step.id],
+            })
+
+        stages_data = [
+            {
                 "id": str(stage.id),
                 "name": stage.name,
                 "description": stage.description,
                 "position": stage.position,
                 "execution_mode": stage.execution_mode or "sequential",
-                "steps": steps_data,
-            })
+                "steps": steps_by_stage[stage.id],
+            }
+            for stage in stages
+        ]
 
-        return {
+        hierarchy = {
             "id": str(workflow.id),
             "name": workflow.name,
             "description": workflow.description,
-            "status": workflow.status.value if hasattr(workflow.status, "value") else str(workflow.status),
+            "status": workflow.status.value,
             "organization_id": str(workflow.organization_id),
             "created_by": str(workflow.created_by),
             "created_at": workflow.created_at.isoformat() if workflow.created_at else None,
             "updated_at": workflow.updated_at.isoformat() if workflow.updated_at else None,
             "stages": stages_data,
         }
+        with _HIERARCHY_CACHE_LOCK:
+            _HIERARCHY_CACHE[cache_key] = hierarchy
+        return hierarchy
@@ -1,9 +1,14 @@
 """Financial data normalization utilities for matching financial statement names."""
 
 import re
+from functools import lru_cache
 from typing import Optional
 from app.constants.financial_mappings import FINANCIAL_STATEMENT_MAPPINGS
 
+_NON_WORD_RE = re.compile(r'[^\w\s]')
+# The ASCII characters _NON_WORD_RE removes, for the bytes.translate fast path
+_ASCII_NON_WORD = bytes(c for c in range(128) if _NON_WORD_RE.match(chr(c)))
+
 
 def normalize_financial_statement_name(name: str) -> str:
     """
@@ -18,20 +23,40 @@ def normalize_financial_statement_name(name: str) -> str:
     """
     if not name or not isinstance(name, str):
         return ""
+    return _normalize_cached(name)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_cached(name: str) -> str:
+    # Remove special characters but keep spaces for multi-word names,
+    # then lowercase and collapse/trim whitespace (str.split splits on the
+    # same characters as \s). Only ever called with non-empty strings, so
+    # the cache keys stay bounded to str.
+    if name.isascii():
+        stripped = name.encode('ascii').translate(None, _ASCII_NON_WORD).decode('ascii')
+    else:
+        stripped = _NON_WORD_RE.sub('', name)
+    return " ".join(stripped.lower().split())
+
+
+def normalize_batch(names) -> list[str]:
+    """
+    Normalize many financial statement names in one call.
     
-    # Remove extra whitespace
-    name = name.strip()
-    
-    # Remove special characters but keep spaces for multi-word names
-    name = re.sub(r'[^\w\s]', '', name)
-    
-    # Convert to lowercase
-    name = name.lower()
-    
-    # Remove extra spaces
-    name = re.sub(r'\s+', ' ', name)
+    Equivalent to calling normalize_financial_statement_name on each name,
+    without the per-call validation overhead.
     
-    return name.strip()
+    Args:
+        names: Raw financial statement names (any iterable)
+        
+    Returns:
+        Normalized names, in input order
+    """
+    normalize = _normalize_cached
+    return [
+        normalize(name) if name and isinstance(name, str) else ""
+        for name in names
+    ]
 
 
 def map_financial_statement_name(name: str) -> Optional[str]:
@@ -48,7 +73,13 @@ def map_financial_statement_name(name: str) -> Optional[str]:
     if not name or not isinstance(name, str):
         return None
     
-    normalized = normalize_financial_statement_name(name)
+    return _map_normalized(normalize_financial_statement_name(name))
+
+
+@lru_cache(maxsize=4096)
+def _map_normalized(normalized: str) -> Optional[str]:
+    # The mappings are static, so the answer depends only on the normalized
+    # name: each distinct name is scanned once per process
     
     # Direct lookup in mappings
     if normalized in FINANCIAL_STATEMENT_MAPPINGS:
@@ -81,15 +112,34 @@ def is_financial_statement_present(
         return False
     
     normalized_statement = normalize_financial_statement_name(statement_name)
-    normalized_expected = [
-        normalize_financial_statement_name(name) for name in expected_names
-    ]
+    return normalized_statement in build_expected_index(expected_names)
+
+
+def build_expected_index(expected_names) -> frozenset[str]:
+    """
+    Build the normalized lookup set for a list of expected statement names.
+    
+    Results are cached per distinct list, so repeated checks against the same
+    framework list normalize it only once.
     
-    return normalized_statement in normalized_expected
+    Args:
+        expected_names: Names to normalize (any iterable of str)
+        
+    Returns:
+        Frozenset of normalized names
+    """
+    return _normalized_expected(tuple(expected_names))
+
+
+@lru_cache(maxsize=64)
+def _normalized_expected(names: tuple[str, ...]) -> frozenset[str]:
+    return frozenset(normalize_batch(names))
 
 
 __all__ = [
     "normalize_financial_statement_name",
+    "normalize_batch",
     "map_financial_statement_name",
     "is_financial_statement_present",
+    "build_expected_index",
 ]
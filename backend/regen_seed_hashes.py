@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Regenerate the precomputed password hashes in seed_db.SEED_USERS.
+
+Prints the SEED_USERS list with hashed_password filled in; paste it back
+into seed_db.py. Hashes that still match their password are kept, so only
+rotated passwords produce a diff.
+"""
+
+import sys
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.security import get_password_hash, verify_password
+from seed_db import SEED_USERS
+
+
+def _hash_if_changed(password: str, existing_hash: Optional[str]) -> str:
+    """Keep the existing hash when it still matches, otherwise hash afresh."""
+    if existing_hash and verify_password(password, existing_hash):
+        return existing_hash
+    return get_password_hash(password)
+
+
+def main():
+    # bcrypt is CPU-bound, so spread the work across cores
+    with ProcessPoolExecutor(max_workers=min(len(SEED_USERS), os.cpu_count() or 1)) as executor:
+        hashes = list(executor.map(
+            _hash_if_changed,
+            [entry.password for entry in SEED_USERS],
+            [entry.hashed_password for entry in SEED_USERS],
+        ))
+
+    print("SEED_USERS = [")
+    for entry, hashed_password in zip(SEED_USERS, hashes):
+        print("    SeedUser(")
+        print(f'        first_name="{entry.first_name}",')
+        print(f'        last_name="{entry.last_name}",')
+        print(f'        email="{entry.email}",')
+        print(f'        password="{entry.password}",')
+        print(f'        hashed_password="{hashed_password}",')
+        print(f'        role=UserRole.{entry.role.name},')
+        print("    ),")
+    print("]")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,13 +7,28 @@ Mapping:
   "Not Applicable"               → "COMPLIANT: N/A"
 
 Only rewrites string leaves in yes_case/no_case fields of decision trees.
+
+Files whose mtime is unchanged since the last successful run are skipped
+(tracked in IFRS_decisiontree/.rewrite_cache.json); pass --force to
+process every file. The cache is discarded automatically when LEAF_MAP or
+REWRITE_VERSION changes.
 """
+import hashlib
 import json
-import glob
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+try:
+    import orjson  # optional: several times faster parse/dump of the large tree files
+except ImportError:
+    orjson = None
 
 TREE_DIR = os.path.join(os.path.dirname(__file__), "IFRS_decisiontree")
+CACHE_FILENAME = ".rewrite_cache.json"
+# Bump when the rewrite logic changes so cached "already done" files are redone
+REWRITE_VERSION = 1
 
 LEAF_MAP = {
     "Raises compliance issue: YES": "COMPLIANT: NO",
@@ -21,55 +36,142 @@ LEAF_MAP = {
     "Not Applicable": "COMPLIANT: N/A",
 }
 
+# Cheap prefilter so long question/label strings skip the LEAF_MAP probe
+_LEAF_PREFIX_LEN = 8
+_LEAF_PREFIXES = frozenset(leaf[:_LEAF_PREFIX_LEN] for leaf in LEAF_MAP)
+_LEAF_MIN_LEN = min(map(len, LEAF_MAP))
+
+# Identifies the rewrite a cache was built with
+_CACHE_FINGERPRINT = hashlib.sha256(
+    json.dumps([REWRITE_VERSION, LEAF_MAP], sort_keys=True).encode("utf-8")
+).hexdigest()
+
 
 def rewrite_tree(node):
-    """Recursively rewrite leaf node strings in a decision tree."""
+    """Recursively rewrite leaf node strings in a decision tree.
+
+    Dict nodes are updated in place (the loaded JSON is only used to write
+    the file back). Returns (node, number_of_leaves_rewritten).
+    """
     if isinstance(node, str):
-        return LEAF_MAP.get(node, node)
+        if len(node) < _LEAF_MIN_LEN or node[:_LEAF_PREFIX_LEN] not in _LEAF_PREFIXES:
+            return node, 0
+        new_leaf = LEAF_MAP.get(node, node)
+        return new_leaf, int(new_leaf != node)
     if isinstance(node, dict):
-        result = dict(node)
-        if "yes_case" in result:
-            result["yes_case"] = rewrite_tree(result["yes_case"])
-        if "no_case" in result:
-            result["no_case"] = rewrite_tree(result["no_case"])
-        return result
-    return node
+        rewrites = 0
+        for branch in ("yes_case", "no_case"):
+            if branch in node:
+                node[branch], n = rewrite_tree(node[branch])
+                rewrites += n
+        return node, rewrites
+    return node, 0
+
+
+def _load_json(filepath):
+    if orjson is not None:
+        with open(filepath, "rb") as f:
+            return orjson.loads(f.read())
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _dump_json(data, filepath):
+    """Write data as 2-space indented UTF-8 JSON with a trailing newline."""
+    if orjson is not None:
+        with open(filepath, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        return
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def _load_cache(cache_path):
+    """Return {filename: mtime_ns} from the last run.
+
+    Returns {} if the cache is missing, unreadable, or was built with a
+    different LEAF_MAP / REWRITE_VERSION.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("fingerprint") != _CACHE_FINGERPRINT:
+        return {}
+    files = data.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def _save_cache(cache, cache_path):
+    """Persist the mtime index atomically (write a temp file, then rename)."""
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": _CACHE_FINGERPRINT, "files": cache}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def process_file(filepath, dry_run=False):
+    """Rewrite the trees in one file. Returns (filename, trees_rewritten)."""
+    data = _load_json(filepath)
+
+    file_rewrites = 0
+    for section in data.get("sections", []):
+        for item in section.get("items", []):
+            tree = item.get("decision_tree")
+            if tree:
+                rewritten, n = rewrite_tree(tree)
+                if n:
+                    item["decision_tree"] = rewritten
+                    file_rewrites += 1
+
+    if file_rewrites > 0 and not dry_run:
+        _dump_json(data, filepath)
+    return os.path.basename(filepath), file_rewrites
 
 
 def main():
     dry_run = "--dry-run" in sys.argv
-    files = sorted(glob.glob(os.path.join(TREE_DIR, "*.json")))
+    force = "--force" in sys.argv
+    cache_path = os.path.join(TREE_DIR, CACHE_FILENAME)
+    cache = {} if force else _load_cache(cache_path)
+
+    files = []
+    skipped = 0
+    with os.scandir(TREE_DIR) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.endswith(".json"):
+                continue
+            if cache.get(entry.name) == entry.stat().st_mtime_ns:
+                skipped += 1
+                continue
+            files.append(entry.path)
+    files.sort()
 
     total_rewrites = 0
     files_changed = 0
 
-    for filepath in files:
-        filename = os.path.basename(filepath)
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        original = json.dumps(data)
-        file_rewrites = 0
-
-        for section in data.get("sections", []):
-            for item in section.get("items", []):
-                tree = item.get("decision_tree")
-                if tree:
-                    rewritten = rewrite_tree(tree)
-                    if json.dumps(rewritten) != json.dumps(tree):
-                        item["decision_tree"] = rewritten
-                        file_rewrites += 1
+    # Files are independent: parse/rewrite/dump them on all cores
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(partial(process_file, dry_run=dry_run), files))
 
+    for filename, file_rewrites in results:
         if file_rewrites > 0:
             files_changed += 1
             total_rewrites += file_rewrites
-            if not dry_run:
-                with open(filepath, "w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2, ensure_ascii=False)
-                    f.write("\n")
             print(f"  {'[DRY] ' if dry_run else ''}Rewrote {file_rewrites} trees in {filename}")
         else:
             print(f"  No changes in {filename}")
+        if not dry_run:
+            # Record the mtime after any rewrite so the next run skips this file
+            cache[filename] = os.stat(os.path.join(TREE_DIR, filename)).st_mtime_ns
+
+    if not dry_run:
+        _save_cache(cache, cache_path)
+
+    if skipped:
+        print(f"  Skipped {skipped} files unchanged since the last run")
 
     print(f"\nTotal: {total_rewrites} trees in {files_changed} files {'(dry run)' if dry_run else 'rewritten'}")
 
@@ -8,98 +8,130 @@ Safe to run multiple times — existing users are updated, not duplicated.
 import sys
 import os
 from datetime import datetime, timezone
+from typing import NamedTuple
 from uuid import uuid4
 
+from sqlalchemy import create_engine, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import sessionmaker
+
 # Add the backend directory to the path
 sys.path.insert(0, os.path.dirname(__file__))
 
-from app.db.session import SessionLocal, engine, Base
+from app.db.session import Base
 from app.models.user import User
 from app.models.agent import Agent, AgentType, AgentStatus, ProviderType
 from app.core.config import settings
 from app.constants.user_enums import UserRole, AuthProvider
-from app.core.security import get_password_hash, create_access_token
+from app.core.security import create_access_token
+
+
+# Seed-only engine with psycopg2 batch executemany. It stays out of
+# app.db.session because batch mode turns off sane multi-row rowcounts, which
+# the app's ORM relies on to detect stale rows in batched UPDATEs.
+engine = create_engine(
+    settings.DATABASE_URL,
+    executemany_mode="values_plus_batch",
+    insertmanyvalues_page_size=1000,
+    executemany_batch_page_size=500,
+)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 # ── Seed users: one per role ────────────────────────────────────────
 
+class SeedUser(NamedTuple):
+    first_name: str
+    last_name: str
+    email: str
+    password: str
+    hashed_password: str
+    role: UserRole
+
+
+# hashed_password is precomputed so seeding does no bcrypt work; after
+# changing a password, run regen_seed_hashes.py and paste its output here.
+
 SEED_USERS = [
-    {
-        "first_name": "Admin",
-        "last_name": "User",
-        "email": "admin@rai-platform.com",
-        "password": "Admin@123456",
-        "role": UserRole.ADMIN,
-    },
-    {
-        "first_name": "Manager",
-        "last_name": "User",
-        "email": "manager@rai-platform.com",
-        "password": "Manager@123456",
-        "role": UserRole.MANAGER,
-    },
-    {
-        "first_name": "End",
-        "last_name": "User",
-        "email": "enduser@rai-platform.com",
-        "password": "Enduser@123456",
-        "role": UserRole.ENDUSER,
-    },
-    {
-        "first_name": "Client",
-        "last_name": "User",
-        "email": "client@rai-platform.com",
-        "password": "Client@123456",
-        "role": UserRole.CLIENT,
-    },
+    SeedUser(
+        first_name="Admin",
+        last_name="User",
+        email="admin@rai-platform.com",
+        password="Admin@123456",
+        hashed_password="$2b$12$50InXbPnOBoHDqwqEwfRBe2pbCOf7EBfdfX.RBXVmcl289e3Gncd2",
+        role=UserRole.ADMIN,
+    ),
+    SeedUser(
+        first_name="Manager",
+        last_name="User",
+        email="manager@rai-platform.com",
+        password="Manager@123456",
+        hashed_password="$2b$12$ywb9Yxib2zBaoph7LOxD5.2Pd2N/AWarvc4DcIL0ZvRkGbKE16lFi",
+        role=UserRole.MANAGER,
+    ),
+    SeedUser(
+        first_name="End",
+        last_name="User",
+        email="enduser@rai-platform.com",
+        password="Enduser@123456",
+        hashed_password="$2b$12$RHnFQHQsg4uf2F/xw3662eB38joHmHh0qFI6Wr9A1yW5kodiAfPaC",
+        role=UserRole.ENDUSER,
+    ),
+    SeedUser(
+        first_name="Client",
+        last_name="User",
+        email="client@rai-platform.com",
+        password="Client@123456",
+        hashed_password="$2b$12$96A8KR/EyXFDkjArHrFYm.8JP6.AUF/Yiun9rddF79I7mMMKOmkK6",
+        role=UserRole.CLIENT,
+    ),
 ]
 
 
-def _upsert_user(db, data: dict) -> User:
-    """Insert or update a user by email (idempotent)."""
-    now = datetime.now(timezone.utc)
-    existing = db.query(User).filter(User.email == data["email"]).first()
-
-    if existing:
-        existing.first_name = data["first_name"]
-        existing.last_name = data["last_name"]
-        existing.hashed_password = get_password_hash(data["password"])
-        existing.role = data["role"]
-        existing.is_active = True
-        existing.auth_provider = AuthProvider.LOCAL
-        existing.updated_at = now
-        db.commit()
-        db.refresh(existing)
-        return existing
+def _upsert_users(db, entries: list[SeedUser]) -> dict[str, tuple[User, bool]]:
+    """Insert or update users by email in one statement (idempotent).
 
-    user = User(
-        id=uuid4(),
-        first_name=data["first_name"],
-        last_name=data["last_name"],
-        email=data["email"],
-        hashed_password=get_password_hash(data["password"]),
-        role=data["role"],
-        is_active=True,
-        auth_provider=AuthProvider.LOCAL,
-        created_at=now,
-        updated_at=now,
+    Returns {email: (user, created)}.
+    """
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "id": uuid4(),
+            "first_name": data.first_name,
+            "last_name": data.last_name,
+            "email": data.email,
+            "hashed_password": data.hashed_password,
+            "role": data.role,
+            "is_active": True,
+            "auth_provider": AuthProvider.LOCAL,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for data in entries
+    ]
+    stmt = pg_insert(User).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["email"],
+        set_={
+            key: stmt.excluded[key]
+            for key in (
+                "first_name", "last_name", "hashed_password", "role",
+                "is_active", "auth_provider", "updated_at",
+            )
+        },
+    ).returning(
+        User,
+        # xmax is 0 only for freshly inserted rows
+        literal_column("xmax = 0").label("created"),
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    # RETURNING already loaded every column the caller reads; the caller
+    # commits once for the whole seed run
+    return {user.email: (user, created) for user, created in db.execute(stmt)}
 
 
 def _upsert_compliance_agent(db, admin_user_id: uuid4) -> Agent:
-    """Insert or update the system compliance agent (idempotent)."""
+    """Insert or update the system compliance agent in one statement (idempotent)."""
     now = datetime.now(timezone.utc)
-    agent_name = "Compliance Analysis Agent"
-
-    existing = db.query(Agent).filter(
-        Agent.name == agent_name,
-        Agent.agent_type == AgentType.COMPLIANCE_ANALYSIS,
-        Agent.is_system == True,
-    ).first()
 
     backend_config = {
         "azure_openai_endpoints": settings.AZURE_OPENAI_ENDPOINTS,
@@ -109,19 +141,9 @@ def _upsert_compliance_agent(db, admin_user_id: uuid4) -> Agent:
         "azure_search_index_name": settings.AZURE_SEARCH_INDEX_NAME,
     }
 
-    if existing:
-        existing.description = "System agent for financial compliance analysis (IFRS, US GAAP, Ind AS). Analyzes financial statements and notes against regulatory standards."
-        existing.status = AgentStatus.ACTIVE
-        existing.backend_provider = "azure"
-        existing.backend_config = backend_config
-        existing.updated_at = now
-        db.commit()
-        db.refresh(existing)
-        return existing
-
-    agent = Agent(
+    stmt = pg_insert(Agent).values(
         id=uuid4(),
-        name=agent_name,
+        name="Compliance Analysis Agent",
         description="System agent for financial compliance analysis (IFRS, US GAAP, Ind AS). Analyzes financial statements and notes against regulatory standards.",
         version="1.0.0",
         agent_type=AgentType.COMPLIANCE_ANALYSIS,
@@ -139,10 +161,18 @@ def _upsert_compliance_agent(db, admin_user_id: uuid4) -> Agent:
         created_at=now,
         updated_at=now,
     )
-    db.add(agent)
-    db.commit()
-    db.refresh(agent)
-    return agent
+    # Conflicts on the partial unique index ux_agents_name_type_system
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name", "agent_type"],
+        # Must match the index predicate textually (WHERE is_system) for
+        # Postgres to infer ux_agents_name_type_system
+        index_where=Agent.is_system,
+        set_={
+            key: stmt.excluded[key]
+            for key in ("description", "status", "backend_provider", "backend_config", "updated_at")
+        },
+    ).returning(Agent)
+    return db.execute(stmt).scalar_one()
 
 
 def seed_database():
@@ -159,18 +189,19 @@ def seed_database():
         print("=" * 64)
 
         admin_user = None
+        users = _upsert_users(db, SEED_USERS)
         for entry in SEED_USERS:
-            user = _upsert_user(db, entry)
+            user, created = users[entry.email]
             token = create_access_token(subject=str(user.id))
 
-            if entry["role"] == UserRole.ADMIN:
+            if entry.role == UserRole.ADMIN:
                 admin_user = user
 
-            status = "updated" if db.query(User).filter(User.email == entry["email"]).count() else "created"
-            print(f"\n  ✅ {entry['role'].value.upper()} user ({status})")
-            print(f"     Email:    {entry['email']}")
-            print(f"     Password: {entry['password']}")
-            print(f"     Role:     {entry['role'].value}")
+            status = "created" if created else "updated"
+            print(f"\n  ✅ {entry.role.value.upper()} user ({status})")
+            print(f"     Email:    {entry.email}")
+            print(f"     Password: {entry.password}")
+            print(f"     Role:     {entry.role.value}")
             print(f"     Token:    {token[:40]}...")
 
         # Seed system agents
@@ -183,6 +214,10 @@ def seed_database():
             print(f"     Type:   {compliance_agent.agent_type.value}")
             print(f"     Status: {compliance_agent.status.value}")
 
+        # Single commit for users + agents; nothing is read back afterwards,
+        # so there is no refresh round trip
+        db.commit()
+
         print("\n" + "-" * 64)
         print("  RBAC Access Matrix")
         print("-" * 64)
@@ -0,0 +1,64 @@
+"""
+Integration tests for the seed_db.py upserts.
+They need a disposable PostgreSQL database: set TEST_DATABASE_URL to run them.
+"""
+import os
+import sys
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"
+)
+
+if TEST_DATABASE_URL:
+    # seed_db builds its engine from settings at import time
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ.setdefault("PROJECT_NAME", "RAi-Platform tests")
+    os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def seed_session():
+    import seed_db
+
+    seed_db.Base.metadata.create_all(bind=seed_db.engine)
+    db = seed_db.SessionLocal()
+    try:
+        yield seed_db, db
+    finally:
+        db.close()
+
+
+def test_upsert_users_twice_reports_updated(seed_session):
+    seed_db, db = seed_session
+
+    seed_db._upsert_users(db, seed_db.SEED_USERS)
+    db.commit()
+    second = seed_db._upsert_users(db, seed_db.SEED_USERS)
+    db.commit()
+
+    assert all(not created for _, created in second.values())
+
+
+def test_upsert_compliance_agent_twice_keeps_one_row(seed_session):
+    seed_db, db = seed_session
+    from app.models.agent import Agent, AgentType
+
+    users = seed_db._upsert_users(db, seed_db.SEED_USERS)
+    admin_id = users["admin@rai-platform.com"][0].id
+
+    first_id = seed_db._upsert_compliance_agent(db, admin_id).id
+    db.commit()
+    second_id = seed_db._upsert_compliance_agent(db, admin_id).id
+    db.commit()
+
+    assert first_id == second_id
+    assert db.query(Agent).filter(
+        Agent.agent_type == AgentType.COMPLIANCE_ANALYSIS,
+        Agent.is_system == True,
+    ).count() == 1
@@ -1,14 +1,38 @@
+import http.client
 import json
-import urllib.request
 
-TOKEN_URL = "http://localhost:8000/api/v1/login/access-token"
-AGENT_URL = "http://localhost:8000/api/v1/agents"
+HOST = "localhost"
+PORT = 8000
+TOKEN_URL = "/api/v1/login/access-token"
+AGENT_URL = "/api/v1/agents"
+
+# One keep-alive connection shared by every request below
+conn = http.client.HTTPConnection(HOST, PORT)
+
+
+class HTTPError(Exception):
+    def __init__(self, code, body):
+        super().__init__(code)
+        self.code = code
+        self.body = body
+
+
+def request(method, url, body=None, headers=None):
+    conn.request(method, url, body=body, headers=headers or {})
+    resp = conn.getresponse()
+    # Read the whole body so the connection is free for the next request
+    data = resp.read()
+    if resp.status >= 400:
+        raise HTTPError(resp.status, data)
+    return json.loads(data)
+
 
 # Get token
 data = "username=admin@rai-platform.com&password=Admin@123456"
-req = urllib.request.Request(TOKEN_URL, data=data.encode(), headers={"Content-Type": "application/x-www-form-urlencoded"})
-resp = urllib.request.urlopen(req)
-token = json.loads(resp.read())["access_token"]
+token = request(
+    "POST", TOKEN_URL, body=data.encode(),
+    headers={"Content-Type": "application/x-www-form-urlencoded"},
+)["access_token"]
 print(f"Token: {token[:20]}...")
 
 # Create compliance agent
@@ -56,50 +80,42 @@ payload = {
     }
 }
 
-req = urllib.request.Request(
-    AGENT_URL,
-    data=json.dumps(payload).encode(),
-    headers={
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {token}"
-    },
-    method="POST"
-)
-
 try:
-    resp = urllib.request.urlopen(req)
-    result = json.loads(resp.read())
+    result = request(
+        "POST",
+        AGENT_URL,
+        body=json.dumps(payload).encode(),
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}"
+        },
+    )
     print("\n=== Agent Created ===")
     print(json.dumps(result, indent=2, default=str))
 
     # Now validate config
     agent_id = result["id"]
     validate_url = f"{AGENT_URL}/{agent_id}/validate-config"
-    req2 = urllib.request.Request(
+    validation = request(
+        "POST",
         validate_url,
-        data=b"",
+        body=b"",
         headers={
             "Content-Type": "application/json",
             "Authorization": f"Bearer {token}"
         },
-        method="POST"
     )
-    resp2 = urllib.request.urlopen(req2)
-    validation = json.loads(resp2.read())
     print("\n=== Config Validation ===")
     print(json.dumps(validation, indent=2, default=str))
 
     # List agents with filter
     list_url = f"{AGENT_URL}?provider_type=external&agent_type=compliance_analysis"
-    req3 = urllib.request.Request(
-        list_url,
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    resp3 = urllib.request.urlopen(req3)
-    agents = json.loads(resp3.read())
+    agents = request("GET", list_url, headers={"Authorization": f"Bearer {token}"})
     print(f"\n=== Agents (external, compliance_analysis): {len(agents)} found ===")
     for a in agents:
         print(f"  - {a['name']} v{a['version']} [{a['provider_type']}:{a['backend_provider']}]")
 
-except urllib.error.HTTPError as e:
-    print(f"HTTP Error {e.code}: {e.read().decode()}")
+except HTTPError as e:
+    print(f"HTTP Error {e.code}: {e.body.decode()}")
+finally:
+    conn.close()